@@ -0,0 +1 @@
+"""Shared data loading and analysis helpers for the figure scripts."""
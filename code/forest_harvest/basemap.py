@@ -0,0 +1,168 @@
+"""Local, pre-projected basemap layers for the Figure 1a map.
+
+``cfeature.BORDERS``/``COASTLINE``/``LAND``/``OCEAN`` make cartopy read (and on
+first use download) Natural Earth shapefiles and project them on every render.
+``build_basemap`` does this once, for the map's Lambert Conformal projection
+and ``PLOT_BBOX``. It stores the projected, clipped geometries as WKB under
+``CACHE_DIR/basemap``, optionally with a pre-rasterised land/ocean
+background. ``add_basemap`` then draws from that store without network
+access. Build the store on a machine with internet access::
+
+    python -m forest_harvest.basemap --raster
+"""
+
+import argparse
+import json
+import os
+import pickle
+from functools import lru_cache
+
+from .paths import CACHE_DIR
+from .trace import traced
+
+STORE_DIR = os.path.join(CACHE_DIR, "basemap")
+
+# Map projection and extent of Figure 1a
+PROJECTION = {"central_longitude": 10, "standard_parallels": (44, 55)}
+PLOT_BBOX = {"min_x": -8.5, "max_x": 28.0, "min_y": 34.0, "max_y": 72.0}
+
+# Natural Earth layer -> (category, name)
+LAYERS = {
+    "ocean": ("physical", "ocean"),
+    "land": ("physical", "land"),
+    "coastline": ("physical", "coastline"),
+    "borders": ("cultural", "admin_0_boundary_lines_land"),
+}
+
+# Same styling as the cfeature calls in Figure 1a
+STYLES = {
+    "ocean": dict(facecolor="lightblue", edgecolor="none", alpha=0.3),
+    "land": dict(facecolor="lightgray", edgecolor="none", alpha=0.3),
+    "coastline": dict(facecolor="none", edgecolor="black", linewidth=0.5),
+    "borders": dict(facecolor="none", edgecolor="black", linewidth=0.5),
+}
+
+# Background layers that go into the optional raster image
+RASTER_LAYERS = ["ocean", "land"]
+
+
+def map_projection():
+    import cartopy.crs as ccrs
+
+    return ccrs.LambertConformal(**PROJECTION)
+
+
+def _clip_box(proj, margin=0.05):
+    """Projected bounding box of ``PLOT_BBOX`` with a relative margin."""
+    import cartopy.crs as ccrs
+    import numpy as np
+    from shapely.geometry import box
+
+    lon = np.linspace(PLOT_BBOX["min_x"], PLOT_BBOX["max_x"], 50)
+    lat = np.linspace(PLOT_BBOX["min_y"], PLOT_BBOX["max_y"], 50)
+    edge_lon = np.concatenate([lon, np.full_like(lat, lon[-1]), lon[::-1], np.full_like(lat, lon[0])])
+    edge_lat = np.concatenate([np.full_like(lon, lat[0]), lat, np.full_like(lon, lat[-1]), lat[::-1]])
+    xyz = proj.transform_points(ccrs.PlateCarree(), edge_lon, edge_lat)
+    x0, y0 = xyz[:, 0].min(), xyz[:, 1].min()
+    x1, y1 = xyz[:, 0].max(), xyz[:, 1].max()
+    dx, dy = (x1 - x0) * margin, (y1 - y0) * margin
+    return box(x0 - dx, y0 - dy, x1 + dx, y1 + dy)
+
+
+def build_basemap(store_dir=STORE_DIR, scale="50m", raster=False, raster_dpi=150):
+    """Project and clip the Natural Earth layers once and write them to ``store_dir``."""
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+    import shapely
+
+    proj = map_projection()
+    clip = _clip_box(proj)
+    layers = {}
+    for name, (category, ne_name) in LAYERS.items():
+        feature = cfeature.NaturalEarthFeature(category, ne_name, scale)
+        geoms = []
+        for geom in feature.geometries():
+            projected = proj.project_geometry(geom, ccrs.PlateCarree())
+            clipped = projected.intersection(clip)
+            if not clipped.is_empty:
+                geoms.append(shapely.to_wkb(clipped))
+        layers[name] = geoms
+
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, "layers.pkl"), "wb") as f:
+        pickle.dump(layers, f)
+    meta = {"projection": PROJECTION, "bbox": PLOT_BBOX, "scale": scale, "extent": list(clip.bounds)}
+    with open(os.path.join(store_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    if raster:
+        _rasterise(store_dir, raster_dpi)
+    _load_layers.cache_clear()
+    return store_dir
+
+
+def _rasterise(store_dir, dpi):
+    """Render the background layers to a PNG covering the stored extent."""
+    from matplotlib.figure import Figure
+
+    layers, meta = _load_layers(store_dir)
+    x0, y0, x1, y1 = meta["extent"]
+    fig = Figure(figsize=(8, 8 * (y1 - y0) / (x1 - x0)), dpi=dpi)
+    ax = fig.add_axes([0, 0, 1, 1], projection=map_projection())
+    ax.set_extent([x0, x1, y0, y1], crs=map_projection())
+    ax.set_axis_off()
+    for name in RASTER_LAYERS:
+        ax.add_geometries(layers[name], crs=map_projection(), **STYLES[name])
+    fig.savefig(os.path.join(store_dir, "background.png"), dpi=dpi, transparent=True)
+
+
+@lru_cache(maxsize=None)
+def _load_layers(store_dir):
+    import shapely
+
+    with open(os.path.join(store_dir, "layers.pkl"), "rb") as f:
+        layers = {name: list(shapely.from_wkb(geoms)) for name, geoms in pickle.load(f).items()}
+    with open(os.path.join(store_dir, "meta.json")) as f:
+        meta = json.load(f)
+    return layers, meta
+
+
+def available(store_dir=STORE_DIR):
+    """True if ``build_basemap`` has been run for ``store_dir``."""
+    return os.path.exists(os.path.join(store_dir, "layers.pkl"))
+
+
+@traced("basemap")
+def add_basemap(ax, store_dir=STORE_DIR, raster=False):
+    """Draw ocean, land, coastline and borders on a map axis from the local store.
+
+    With ``raster=True`` and a stored background image, ocean and land are
+    drawn as that image and only the line layers are drawn as vectors.
+    """
+    from matplotlib.image import imread
+
+    layers, meta = _load_layers(store_dir)
+    proj = map_projection()
+    background = os.path.join(store_dir, "background.png")
+
+    vector_layers = list(LAYERS)
+    if raster and os.path.exists(background):
+        x0, y0, x1, y1 = meta["extent"]
+        ax.imshow(imread(background), extent=[x0, x1, y0, y1], transform=proj, origin="upper", zorder=0)
+        vector_layers = [name for name in vector_layers if name not in RASTER_LAYERS]
+
+    for name in vector_layers:
+        ax.add_geometries(layers[name], crs=proj, **STYLES[name])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the local basemap store for the harvest map")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--scale", default="50m", choices=["10m", "50m", "110m"])
+    parser.add_argument("--raster", action="store_true", help="also pre-rasterise the land/ocean background")
+    args = parser.parse_args(argv)
+    print(f"Basemap written to {build_basemap(args.store, args.scale, args.raster)}")
+
+
+if __name__ == "__main__":
+    main()
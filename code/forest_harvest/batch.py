@@ -0,0 +1,93 @@
+"""Render the LST figures for many forest types and patch sizes in one run.
+
+Each (forest, patch) combination is loaded once and all requested figure
+kinds are drawn from that single load. Combinations are spread over a
+process pool. Run from the ``code`` directory::
+
+    python -m forest_harvest.batch --forests NF BF MF TOT --patches 220cell 330cell 5km
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .paths import DATA_DIR, GRAPH_DIR, LST_DIR
+
+FORESTS = ["NF", "BF", "MF", "TOT"]
+PATCHES = ["220cell", "330cell", "5km"]
+
+# Figure kind -> function name in lst_figures
+FIGURE_KINDS = {
+    "barchart": "seasonal_barchart",      # Figures 2, 3, 6
+    "effectyears": "effect_year_curves",  # Figures 4, 5
+    "quantiles": "effect_year_quantiles",  # Pooled percentiles of Figures 4, 5
+}
+
+
+def render_combination(forest, patch, kinds, data_dir=DATA_DIR, graph_dir=GRAPH_DIR, lst_dir=LST_DIR,
+                       ci=None, weighting=None):
+    """Load one (forest, patch) export and draw every figure kind from it."""
+    from . import lst_data, lst_figures
+
+    day_df, night_df = lst_data.load_day_night(forest, patch, lst_dir=lst_dir)
+    for kind in kinds:
+        figure = getattr(lst_figures, FIGURE_KINDS[kind])
+        # The pooled-quantile figure has no error-bar options
+        options = {} if kind == "quantiles" else dict(ci=ci, weighting=weighting)
+        figure(day_df, night_df, forest, patch, data_dir=data_dir, graph_dir=graph_dir,
+               show=False, workers=1, **options)
+    return forest, patch
+
+
+def run_batch(forests, patches, kinds, workers=None, data_dir=DATA_DIR, graph_dir=GRAPH_DIR, lst_dir=LST_DIR,
+              ci=None, weighting=None):
+    """Render all combinations that have exports; returns the rendered (forest, patch) pairs."""
+    from . import render
+    from .catalog import get_catalog
+
+    unknown = set(kinds) - set(FIGURE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown figure kinds {sorted(unknown)}; choose from {sorted(FIGURE_KINDS)}")
+
+    catalog = get_catalog(lst_dir)
+    combos = []
+    for forest in forests:
+        for patch in patches:
+            if catalog.pairs(patch, forest):
+                combos.append((forest, patch))
+            else:
+                print(f"No exports for {forest} {patch}, skipping...")
+
+    # Workers never open windows
+    render.use_headless()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_combination, forest, patch, kinds, data_dir, graph_dir, lst_dir, ci, weighting)
+            for forest, patch in combos
+        ]
+        return [f.result() for f in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forests", nargs="+", default=FORESTS)
+    parser.add_argument("--patches", nargs="+", default=PATCHES)
+    parser.add_argument("--kinds", nargs="+", default=list(FIGURE_KINDS), choices=list(FIGURE_KINDS))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--ci", choices=["iid", "block"], default=None, help="bootstrap intervals instead of the SE")
+    parser.add_argument("--weighting", choices=["count", "inverse_variance"], default=None,
+                        help="weight records by pixel count or inverse variance")
+    parser.add_argument("--trace", metavar="PATH", help="record per-stage timings to PATH (.csv or JSON lines)")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        from . import trace
+        trace.enable(args.trace)
+
+    for forest, patch in run_batch(args.forests, args.patches, args.kinds, args.workers, ci=args.ci,
+                                   weighting=args.weighting):
+        print(f"Rendered {forest} {patch}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""Time and memory benchmarks of the pipeline stages.
+
+Every stage is set up outside the timed region and then run ``repeat``
+times. The best wall time is reported, together with the peak of Python
+heap allocations (``tracemalloc``, numpy buffers included) measured on one
+extra run. Stages run on the shipped data (scale 1) and on inputs scaled
+up by an integer factor:
+
+- ``ingest_lst``, ``ingest_harvest``: CSVs whose data rows are repeated;
+- ``pairing``, ``effect_year_grouping``: frames stacked ``scale`` times with
+  the years shifted, so every copy keeps unique pairing keys;
+- ``raster_chain``: a synthetic loss stack built from a window of
+  ``ForestLossRatio_2004_2023_v2.tif``, ``scale`` times the base area;
+- ``render_map``: the same window drawn on the map, ``scale`` times the
+  pixels of a 20 km grid.
+
+Stage memoisation and the Feather cache are off, so every run does the
+work. Results are appended to a JSON-lines history (under ``CACHE_DIR``
+by default) and compared with the previous run of the same stage, scale
+and host. Run from the ``code`` directory::
+
+    python -m forest_harvest.benchmarks --scales 1 10 100 --raster-scales 1 4
+"""
+
+import argparse
+import datetime
+import gc
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .paths import CACHE_DIR, DATA_DIR, LST_DIR, REPO_DIR
+
+# Kept with the caches, outside the source tree
+HISTORY_PATH = CACHE_DIR / "benchmarks.jsonl"
+RATIO_RASTER = "ForestLossRatio_2004_2023_v2.tif"
+
+# Export used for the LST stages
+FOREST, PATCH = "TOT", "220cell"
+
+# Side of the scale-1 raster window and bands of the synthetic loss stack (2000-2022)
+RASTER_SIDE = 1024
+RASTER_BANDS = 23
+
+# Side of the scale-1 map raster, about the 20 km grid that Figure 1a draws
+MAP_SIDE = 256
+
+# Slowdown over the previous run that is reported as a regression
+TOLERANCE = 0.2
+
+
+def _scaled_copy(src, dst, scale):
+    """Copy a CSV with its data rows repeated ``scale`` times."""
+    with open(src) as f:
+        header = f.readline()
+        body = f.read()
+    if body and not body.endswith("\n"):
+        body += "\n"
+    with open(dst, "w") as f:
+        f.write(header)
+        for _ in range(scale):
+            f.write(body)
+
+
+def _stack_years(df, scale):
+    """``scale`` copies of an LST frame; copy ``k`` has its years shifted by ``100 * k``."""
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        copy["lossYear"] = copy["lossYear"] + 100 * k
+        copy["analysisYear"] = copy["analysisYear"] + 100 * k
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _ratio_window(side):
+    """A ``side`` x ``side`` window of the ratio raster around the forested core, tiled if needed."""
+    import rasterio
+    from rasterio.windows import Window
+
+    with rasterio.open(DATA_DIR / RATIO_RASTER) as src:
+        rows, cols = min(side, src.height), min(side, src.width)
+        window = Window((src.width - cols) // 2, (src.height - rows) // 2, cols, rows)
+        ratio = src.read(1, window=window)
+        transform = src.window_transform(window)
+    reps = (math.ceil(side / rows), math.ceil(side / cols))
+    return np.tile(ratio, reps)[:side, :side], transform
+
+
+# Stage setups: ``setup(scale, workdir)`` prepares the inputs and returns the timed callable
+
+
+def _setup_ingest_lst(scale, workdir):
+    from . import lst_data
+    from .catalog import get_catalog
+
+    lst_dir = workdir / "LST_Diff"
+    lst_dir.mkdir()
+    for day, night in get_catalog(LST_DIR).pairs(PATCH, FOREST):
+        for entry in (day, night):
+            _scaled_copy(entry.path, lst_dir / Path(entry.path).name, scale)
+    return lambda: lst_data.load_day_night(FOREST, PATCH, lst_dir=lst_dir, use_cache=False)
+
+
+def _setup_ingest_harvest(scale, workdir):
+    from . import harvest_cube
+
+    for source in harvest_cube.SOURCE_DIRS:
+        src_dir = DATA_DIR / source
+        if not src_dir.is_dir():
+            continue
+        (workdir / source).mkdir()
+        for path in src_dir.glob("*.csv"):
+            _scaled_copy(path, workdir / source / path.name, scale)
+    return lambda: harvest_cube.build_harvest_table(workdir)
+
+
+def _paired_inputs(scale):
+    from . import lst_data
+
+    day, night = lst_data.load_day_night(FOREST, PATCH, use_cache=False)
+    day = lst_data.prepare_lst(_stack_years(day, scale), "Daytime LST", 50)
+    night = lst_data.prepare_lst(_stack_years(night, scale), "Nighttime LST", 50)
+    return day, night
+
+
+def _setup_pairing(scale, workdir):
+    from .pairing import pair_day_night
+
+    day, night = _paired_inputs(scale)
+    return lambda: pair_day_night(day, night)
+
+
+def _setup_effect_year_grouping(scale, workdir):
+    from .grouped_stats import grouped_moments
+    from .pairing import pair_day_night
+
+    paired = pair_day_night(*_paired_inputs(scale))
+    paired["Daily LST"] = (paired["Daytime LST"] + paired["Nighttime LST"]) / 2
+    columns = ["Daytime LST", "Nighttime LST", "Daily LST"]
+    return lambda: grouped_moments(paired, ["region", "season", "effectYear"], columns)
+
+
+def _setup_raster_chain(scale, workdir):
+    import rasterio
+
+    from .harvest_raster import FULL_FOREST, harvest_fraction_sum
+
+    side = int(RASTER_SIDE * math.sqrt(scale))
+    ratio, transform = _ratio_window(side)
+    # Loss per year: a seeded share of the ratio, with the odd windthrow-like spike
+    rng = np.random.default_rng(0)
+    forest = np.full((side, side), FULL_FOREST, dtype=np.int32)
+    share = np.nan_to_num(ratio) / 100 / 20
+    profile = dict(driver="GTiff", height=side, width=side, crs="EPSG:4326", transform=transform,
+                   tiled=True, blockxsize=256, blockysize=256, compress="lzw")
+
+    loss_path, forest_path = workdir / "loss.tif", workdir / "forest.tif"
+    with rasterio.open(loss_path, "w", count=RASTER_BANDS, dtype="int32", **profile) as dst:
+        for band in range(1, RASTER_BANDS + 1):
+            factor = rng.gamma(4.0, 0.25, size=(side, side)) * np.where(rng.random((side, side)) < 0.01, 10, 1)
+            dst.write((share * factor * FULL_FOREST).astype(np.int32), band)
+    with rasterio.open(forest_path, "w", count=1, dtype="int32", **profile) as dst:
+        dst.write(forest, 1)
+
+    out_path = workdir / "time_sum_final_loss.tif"
+    return lambda: harvest_fraction_sum(loss_path, forest_path, out_path, memo=False)
+
+
+def _setup_render_barchart(scale, workdir):
+    import matplotlib.pyplot as plt
+
+    from .lst_figures import LST_COLUMNS, SEASONS_TO_PLOT, _draw_barchart
+
+    rng = np.random.default_rng(0)
+    summary = pd.DataFrame({f"{name}_{stat}": rng.normal(size=len(SEASONS_TO_PLOT)) ** 2
+                            for name in LST_COLUMNS for stat in ("mean", "se")}, index=SEASONS_TO_PLOT)
+
+    def run():
+        fig = _draw_barchart(summary)
+        fig.savefig(io.BytesIO(), format="pdf")
+        plt.close(fig)
+
+    return run
+
+
+def _setup_render_map(scale, workdir):
+    try:
+        import cartopy.crs as ccrs
+    except ImportError:
+        return None
+    import matplotlib.pyplot as plt
+
+    from . import basemap
+
+    side = int(MAP_SIDE * math.sqrt(scale))
+    ratio, transform = _ratio_window(side)
+    # Pixel edges, drawn with pcolormesh as xarray does in Figure 1a
+    lon = transform.c + transform.a * np.arange(side + 1)
+    lat = transform.f + transform.e * np.arange(side + 1)
+
+    def run():
+        fig, ax = plt.subplots(figsize=(10, 8), subplot_kw={"projection": basemap.map_projection()})
+        ax.pcolormesh(lon, lat, np.ma.masked_invalid(ratio), transform=ccrs.PlateCarree(), cmap="YlGn",
+                      vmin=0, vmax=30)
+        if basemap.available():
+            basemap.add_basemap(ax, raster=True)
+        fig.savefig(io.BytesIO(), format="pdf", bbox_inches="tight")
+        plt.close(fig)
+
+    return run
+
+
+# Stage -> (kind of scale, setup); "rows" stages take --scales, "raster" stages --raster-scales
+STAGES = {
+    "ingest_lst": ("rows", _setup_ingest_lst),
+    "ingest_harvest": ("rows", _setup_ingest_harvest),
+    "pairing": ("rows", _setup_pairing),
+    "effect_year_grouping": ("rows", _setup_effect_year_grouping),
+    "raster_chain": ("raster", _setup_raster_chain),
+    "render_barchart": ("fixed", _setup_render_barchart),
+    "render_map": ("raster", _setup_render_map),
+}
+
+
+def measure(run, repeat=3):
+    """Best and median wall time of ``repeat`` runs, and the peak traced allocation (MB) of one more."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), float(np.median(times)), peak / 2**20
+
+
+def _max_rss_mb():
+    """Peak resident set size of this process in MB; None where ``resource`` is missing (Windows)."""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                             text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _environment():
+    return {
+        "commit": _commit(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def run_benchmarks(stages=None, scales=(1, 10), raster_scales=(1,), repeat=3):
+    """Run the stages at every scale; returns one record per (stage, scale)."""
+    from . import memo
+    from .render import use_headless
+
+    stages = list(STAGES) if stages is None else list(stages)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}; choose from {sorted(STAGES)}")
+
+    os.environ[memo.MEMO_ENV] = "0"
+    use_headless()
+    env = _environment()
+    timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+    records = []
+    for stage in stages:
+        kind, setup = STAGES[stage]
+        for scale in {"rows": scales, "raster": raster_scales, "fixed": (1,)}[kind]:
+            workdir = Path(tempfile.mkdtemp(prefix=f"bench_{stage}_"))
+            try:
+                run = setup(scale, workdir)
+                if run is None:
+                    print(f"{stage}: not available here, skipping...")
+                    break
+                best, median, peak_mb = measure(run, repeat)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            records.append(dict(env, time=timestamp, stage=stage, scale=scale, repeat=repeat,
+                                seconds=round(best, 6), median_seconds=round(median, 6),
+                                peak_mb=round(peak_mb, 2),
+                                max_rss_mb=_max_rss_mb()))
+            print(f"{stage:22s} x{scale:<4d} {best:9.4f} s  {peak_mb:9.1f} MB")
+    return records
+
+
+def read_history(path=HISTORY_PATH):
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(records, path=HISTORY_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def compare(records, history, tolerance=TOLERANCE):
+    """Ratio of every record's time to the last earlier run of its stage and scale on the same host.
+
+    Returns ``(record, previous, ratio)`` triples for records with a
+    previous run; a ratio above ``1 + tolerance`` is a regression.
+    """
+    previous = {}
+    for old in history:
+        previous[old["stage"], old["scale"], old.get("host")] = old
+    out = []
+    for record in records:
+        old = previous.get((record["stage"], record["scale"], record["host"]))
+        if old is not None and old["seconds"] > 0:
+            out.append((record, old, record["seconds"] / old["seconds"]))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100], help="row multipliers")
+    parser.add_argument("--raster-scales", nargs="+", type=int, default=[1, 4], help="raster area multipliers")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON-lines history file (default: CACHE_DIR/benchmarks.jsonl)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on a regression")
+    args = parser.parse_args(argv)
+
+    history = read_history(args.history)
+    records = run_benchmarks(args.stages, args.scales, args.raster_scales, args.repeat)
+    append_history(records, args.history)
+
+    regressions = 0
+    for record, old, ratio in compare(records, history, args.tolerance):
+        flag = ""
+        if ratio > 1 + args.tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{record['stage']:22s} x{record['scale']:<4d} {ratio:6.2f}x vs {old['commit']} ({old['time']}){flag}")
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
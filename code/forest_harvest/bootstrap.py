@@ -0,0 +1,145 @@
+"""Bootstrap confidence intervals of group means, all groups at once.
+
+Rows are laid out contiguously per group, optionally sorted within the group
+(by loss year, effect year, ...). A batch of replicates is then one array of
+uniform draws with one draw per row per replicate. The draws are turned
+into positions inside each row's own group and summed per group with
+``np.add.reduceat``. No Python loop runs over replicates or groups.
+
+``block=None`` resamples rows independently. ``block=L`` is a circular block
+bootstrap: every run of ``L`` consecutive positions in a group is copied from
+a random start, wrapping at the end of the group. This keeps the dependence
+between neighbouring cohorts.
+
+Replicates are generated in fixed-size chunks. Each chunk has its own
+``SeedSequence`` child, so results depend on ``seed`` but not on
+``workers``. Chunks run on a thread pool; the array work releases the GIL.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .grouped_stats import group_codes
+from .memo import memoised
+from .trace import traced
+
+
+def _layout(codes, x, ngroups, order=None, valid=None):
+    """Valid rows sorted by group (then ``order``), their codes, group sizes, offsets and in-group ranks."""
+    keep = (codes >= 0) & ~np.isnan(x)
+    if valid is not None:
+        keep &= valid
+    rows = np.flatnonzero(keep)
+    keys = (codes[rows],) if order is None else (order[rows], codes[rows])
+    rows = rows[np.lexsort(keys)]
+    codes = codes[rows]
+    counts = np.bincount(codes, minlength=ngroups)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(rows)) - offsets[codes]
+    return rows, codes, counts, offsets, rank
+
+
+def _replicate_positions(rng, n_rep, codes, counts, offsets, rank, block):
+    size = counts[codes]
+    # float32 draws are exact enough to pick among fewer than 2**24 rows
+    u = rng.random((n_rep, len(codes)), dtype=np.float32)
+    if block is None or block <= 1:
+        pos = (u * size.astype(np.float32)).astype(np.intp)
+    else:
+        # The draw of the first row of each block sets that block's start
+        first = offsets[codes] + rank - rank % block
+        pos = (u[:, first] * size.astype(np.float32)).astype(np.intp) + rank % block
+        pos %= size
+    np.minimum(pos, size - 1, out=pos)
+    pos += offsets[codes]
+    return pos
+
+
+def bootstrap_means(codes, x, ngroups, n_boot=10000, block=None, order=None, seed=0, workers=None,
+                    batch_elements=2**22, weights=None):
+    """Bootstrap replicates of every group mean as an ``(n_boot, ngroups)`` array.
+
+    ``codes`` are group codes per row (-1 skips the row) and NaN values are
+    skipped. Empty groups are NaN. ``batch_elements`` bounds the number of
+    draws held in memory per chunk of replicates. With ``weights`` each
+    replicate is the weighted mean of the resampled rows; rows with a
+    non-finite weight are skipped.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    w = None if weights is None else np.asarray(weights, dtype=np.float64)
+    rows, codes, counts, offsets, rank = _layout(np.asarray(codes), x, ngroups,
+                                                 None if order is None else np.asarray(order),
+                                                 None if w is None else np.isfinite(w))
+    x = x[rows]
+    if w is not None:
+        w = w[rows]
+        xw = x * w
+    out = np.full((n_boot, ngroups), np.nan)
+    if len(x) == 0:
+        return out
+
+    nonempty = counts > 0
+    group_starts = offsets[nonempty]
+    chunk = max(1, min(n_boot, batch_elements // len(x)))
+    starts = range(0, n_boot, chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+
+    def run(i):
+        lo = starts[i]
+        hi = min(lo + chunk, n_boot)
+        pos = _replicate_positions(np.random.default_rng(seeds[i]), hi - lo, codes, counts, offsets, rank, block)
+        if w is None:
+            out[lo:hi, nonempty] = np.add.reduceat(x[pos], group_starts, axis=1) / counts[nonempty]
+        else:
+            out[lo:hi, nonempty] = (np.add.reduceat(xw[pos], group_starts, axis=1)
+                                    / np.add.reduceat(w[pos], group_starts, axis=1))
+
+    if workers == 1 or len(starts) < 2:
+        for i in range(len(starts)):
+            run(i)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, range(len(starts))))
+    return out
+
+
+def percentile_ci(replicates, level=0.95):
+    """Percentile interval (low, high) of each column of ``replicates``; NaN for empty groups."""
+    tail = (1 - level) / 2 * 100
+    low = np.full(replicates.shape[1], np.nan)
+    high = low.copy()
+    valid = ~np.isnan(replicates[0])
+    low[valid], high[valid] = np.percentile(replicates[:, valid], [tail, 100 - tail], axis=0)
+    return low, high
+
+
+@traced("bootstrap")
+@memoised("grouped_bootstrap_ci")
+def grouped_bootstrap_ci(df, by, values, order=None, level=0.95, n_boot=10000, block=None, seed=0,
+                         workers=None, weights=None):
+    """Bootstrap CIs of the mean of ``values`` per ``by`` group as a tidy frame.
+
+    Rows and naming follow ``grouped_stats.grouped_moments``: the ``by``
+    columns, then ``ci_low``/``ci_high``, prefixed with the column name when
+    ``values`` is a list. ``order`` names the column that sets the sequence
+    of rows inside a group for the block bootstrap. ``weights`` names weight
+    columns as in ``grouped_moments`` and bootstraps the weighted means.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    columns = [values] if isinstance(values, str) else list(values)
+
+    if weights is None:
+        weight_columns = [None] * len(columns)
+    else:
+        weight_columns = [weights] if isinstance(weights, str) else list(weights)
+
+    codes, ngroups, out = group_codes(df, by)
+    order_values = None if order is None else df[order].to_numpy()
+    for i, (column, weight_column) in enumerate(zip(columns, weight_columns)):
+        w = None if weight_column is None else df[weight_column].to_numpy(dtype=np.float64)
+        replicates = bootstrap_means(codes, df[column].to_numpy(dtype=np.float64), ngroups, n_boot, block,
+                                     order_values, seed=(seed, i), workers=workers, weights=w)
+        prefix = "" if isinstance(values, str) else f"{column}_"
+        out[prefix + "ci_low"], out[prefix + "ci_high"] = percentile_ci(replicates, level)
+    return out
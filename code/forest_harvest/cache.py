@@ -0,0 +1,88 @@
+"""On-disk columnar cache for parsed input tables.
+
+Each source file is parsed once and stored as a Feather (Arrow IPC) file next
+to a small JSON record of the source's mtime, size and SHA-256. A later read
+returns the Feather copy as long as the source is unchanged. A new mtime with
+identical content (``touch``, a fresh checkout) only refreshes the record.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by DataFrame.to_feather)
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_atomic(path, write):
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class FrameCache:
+    """Feather copies of parsed source files, keyed by name.
+
+    ``version`` is stored with every entry; entries written under another
+    version are rebuilt, which covers changes to the parsing code.
+    """
+
+    def __init__(self, root, version=""):
+        self.root = Path(root)
+        self.version = version
+
+    def _paths(self, key):
+        return self.root / f"{key}.feather", self.root / f"{key}.json"
+
+    def _cached(self, key, source, st):
+        data_path, meta_path = self._paths(key)
+        if not (data_path.exists() and meta_path.exists()):
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != self.version or meta.get("size") != st.st_size:
+            return None
+        if meta.get("mtime_ns") != st.st_mtime_ns:
+            if meta.get("sha256") != file_digest(source):
+                return None
+            meta["mtime_ns"] = st.st_mtime_ns
+            _write_atomic(meta_path, lambda p: p.write_text(json.dumps(meta)))
+        return pd.read_feather(data_path)
+
+    def get(self, key, source, build):
+        """Return ``build(source)``, served from the cache when possible."""
+        if not HAVE_ARROW:
+            return build(source)
+
+        st = os.stat(source)
+        df = self._cached(key, source, st)
+        if df is not None:
+            return df
+
+        df = build(source).reset_index(drop=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        _write_atomic(data_path, df.to_feather)
+        meta = {
+            "source": str(source),
+            "version": self.version,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": file_digest(source),
+        }
+        _write_atomic(meta_path, lambda p: p.write_text(json.dumps(meta)))
+        return df
@@ -0,0 +1,118 @@
+"""Index of the LST export files by parsed file-name metadata.
+
+Export names encode what is inside them, e.g.::
+
+    LST_Day_220cell_BF_Summer.csv
+    LST_Day_220cell_TOT_Summer_elev_diff100.csv
+    lstDay_Diff_Statistics_noFire_noWind_TOT_220cells_Summer.csv   (older 1 km)
+
+A catalog scans its directories once, parses every name into
+(variable, patch, forest, season, suffix) and answers lookups and day/night
+pairing queries from a dictionary, so files are matched on what they contain
+rather than on the order of two directory listings.
+"""
+
+import os
+import re
+import warnings
+from collections import namedtuple
+from functools import lru_cache
+
+LSTFile = namedtuple("LSTFile", "variable patch forest season suffix path")
+
+_PATTERNS = [
+    re.compile(
+        r"^LST_(?P<variable>Day|Night|Daily_Mean)_(?P<patch>\d+cell|\d+km)_(?P<forest>[A-Z]+)"
+        r"_(?P<season>[A-Za-z]+)(?:_(?P<suffix>.+))?\.csv$"),
+    re.compile(
+        r"^lst(?P<variable>Day|Night)_Diff_Statistics_noFire_noWind_(?P<forest>[A-Z]+)"
+        r"_(?P<patch>\d+cell)s_(?P<season>[A-Za-z]+)(?:_(?P<suffix>.+))?\.csv$"),
+]
+
+
+def patch_label(patch):
+    """Normalise a patch/resolution (``220``, ``"220cell"``, ``"5km"``)."""
+    patch = str(patch)
+    return f"{patch}cell" if patch.isdigit() else patch
+
+
+def parse_name(filename):
+    """Parse an export file name, or return None if it is not an LST export."""
+    for pattern in _PATTERNS:
+        m = pattern.match(filename)
+        if m:
+            return m.group("variable"), m.group("patch"), m.group("forest"), \
+                m.group("season"), m.group("suffix") or ""
+    return None
+
+
+class LSTCatalog:
+    """All LST exports found in one or more directories."""
+
+    def __init__(self, *dirs):
+        self.dirs = [os.fspath(d) for d in dirs]
+        self._files = {}   # (variable, patch, forest, season, suffix) -> LSTFile
+        self._groups = {}  # (variable, patch, forest, suffix) -> {season: LSTFile}
+        for d in self.dirs:
+            self._scan(d)
+
+    def _scan(self, directory):
+        with os.scandir(directory) as entries:
+            # Sorted so that the current export family wins over the legacy one
+            for entry in sorted(entries, key=lambda e: e.name):
+                meta = parse_name(entry.name)
+                if meta is None or not entry.is_file():
+                    continue
+                if meta in self._files:
+                    continue
+                variable, patch, forest, season, suffix = meta
+                item = LSTFile(variable, patch, forest, season, suffix, entry.path)
+                self._files[meta] = item
+                self._groups.setdefault((variable, patch, forest, suffix), {})[season] = item
+
+    def __len__(self):
+        return len(self._files)
+
+    def __iter__(self):
+        return iter(self._files.values())
+
+    def get(self, variable, patch, forest, season, suffix=""):
+        """Return the matching export or None."""
+        return self._files.get((variable, patch_label(patch), forest, season, suffix))
+
+    def files(self, variable, patch, forest, suffix=""):
+        """Return all seasons of one export, ordered by season name."""
+        group = self._groups.get((variable, patch_label(patch), forest, suffix), {})
+        return [group[s] for s in sorted(group)]
+
+    def pair(self, patch, forest, season, suffix=""):
+        """Return the (day, night) exports for one season; KeyError if either is missing."""
+        day = self.get("Day", patch, forest, season, suffix)
+        night = self.get("Night", patch, forest, season, suffix)
+        if day is None or night is None:
+            raise KeyError((patch_label(patch), forest, season, suffix))
+        return day, night
+
+    def pairs(self, patch, forest, suffix=""):
+        """Return (day, night) pairs for every season present on both sides.
+
+        Seasons that exist for only one of the two variables are reported with
+        a warning instead of being silently mis-paired.
+        """
+        key = (patch_label(patch), forest, suffix)
+        day = self._groups.get(("Day",) + key, {})
+        night = self._groups.get(("Night",) + key, {})
+        unpaired = sorted(set(day) ^ set(night))
+        if unpaired:
+            warnings.warn(f"No day/night counterpart for {key} seasons {unpaired}", stacklevel=2)
+        return [(day[s], night[s]) for s in sorted(set(day) & set(night))]
+
+
+@lru_cache(maxsize=None)
+def _catalog(dirs):
+    return LSTCatalog(*dirs)
+
+
+def get_catalog(*dirs):
+    """Return a catalog of ``dirs``, scanning each directory set only once per process."""
+    return _catalog(tuple(os.path.abspath(os.fspath(d)) for d in dirs))
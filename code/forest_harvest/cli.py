@@ -0,0 +1,199 @@
+"""The ``forest-harvest`` command line.
+
+One subcommand per figure or analysis::
+
+    forest-harvest harvest-map                  # Figure 1a
+    forest-harvest harvest-bars                 # Figure 1b
+    forest-harvest harvest-types                # Figure 1c
+    forest-harvest lst-regions --forest TOT     # Figures 2, 3, 6
+    forest-harvest lst-temporal --forest BF     # Figures 4, 5
+    forest-harvest lst-quantiles --forest BF
+    forest-harvest lst-elevation --forest TOT   # Figures 2 and 4, all records vs elev_diff100
+    forest-harvest lst-resolutions --forest TOT # Figures 2 and 4 at 220cell, 330cell and 5km
+    forest-harvest batch --patches 220cell 5km  # also benchmarks, synthetic, trace, basemap, cube, trends
+
+Every subcommand imports its modules when it runs, so only the map pulls
+in rasterio, rioxarray and cartopy. Paths default to the repository's
+``data``/``graph`` directories and can be given with ``--data-dir``,
+``--graph-dir`` and ``--cache-dir``, which hold for the pass-through
+subcommands as well: they read their inputs from ``--data-dir`` and keep
+every cache under ``--cache-dir``. Also runs as ``python -m forest_harvest``.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# Subcommands that hand their arguments to a module's own ``main``
+MODULE_COMMANDS = {
+    "batch": ("forest_harvest.batch", "render the LST figures of many forests and patches"),
+    "benchmarks": ("forest_harvest.benchmarks", "time the pipeline stages"),
+    "synthetic": ("forest_harvest.synthetic", "write a synthetic export corpus"),
+    "trace": ("forest_harvest.trace", "summarise a stage trace"),
+    "basemap": ("forest_harvest.basemap", "build the local basemap store"),
+    "cube": ("forest_harvest.raster_cube", "convert rasters into memory-mapped year cubes"),
+    "trends": ("forest_harvest.trends", "map per-pixel harvest trends"),
+}
+
+
+def _harvest_map(args):
+    from .harvest_figures import harvest_map
+
+    harvest_map(args.data_dir, args.graph_dir, args.cache_dir, args.loss, args.forest_raster, args.out,
+                equal_area=not args.geographic, memory_budget_mb=args.memory_budget_mb, show=args.show)
+
+
+def _harvest_bars(args):
+    from .harvest_figures import harvest_bars
+
+    harvest_bars(args.data_dir, args.graph_dir, args.cache_dir, args.out, variant=args.variant,
+                 first_year=args.first_year, show=args.show)
+
+
+def _harvest_types(args):
+    from .harvest_figures import harvest_types
+
+    harvest_types(args.data_dir, args.graph_dir, args.cache_dir, args.out, variant=args.variant,
+                  year_start=args.years[0], year_end=args.years[1], show=args.show)
+
+
+def _lst_figure(name, **options):
+    def run(args):
+        from . import lst_data, lst_figures
+
+        lst_dir = args.lst_dir or _lst_dirs(args.data_dir)
+        day_df, night_df = lst_data.load_day_night(args.forest, args.patch, args.suffix, lst_dir=lst_dir,
+                                                   cache_dir=args.cache_dir)
+        extra = {key: getattr(args, key) for key in options}
+        figure = getattr(lst_figures, name)
+        figure(day_df, night_df, args.forest, args.patch, data_dir=args.out_dir or args.data_dir,
+               graph_dir=args.graph_dir, show=args.show, workers=args.workers, suffix=args.suffix, **extra)
+    return run
+
+
+def _lst_dirs(data_dir):
+    from .paths import LST_DIRS
+
+    return [os.path.join(data_dir, path.name) for path in LST_DIRS]
+
+
+def _lst_elevation(args):
+    from .lst_figures import elevation_comparison
+
+    elevation_comparison(args.forest, args.patch, data_dir=args.out_dir or args.data_dir, graph_dir=args.graph_dir,
+                         show=args.show, workers=args.workers, ci=args.ci, weighting=args.weighting,
+                         suffix=args.suffix or "elev_diff100", lst_dir=args.lst_dir or _lst_dirs(args.data_dir),
+                         cache_dir=args.cache_dir)
+
+
+def _lst_resolutions(args):
+    from .lst_figures import resolution_comparison
+
+    resolution_comparison(args.forest, args.patches, data_dir=args.out_dir or args.data_dir, graph_dir=args.graph_dir,
+                          show=args.show, workers=args.workers, ci=args.ci, weighting=args.weighting,
+                          lst_dir=args.lst_dir or _lst_dirs(args.data_dir), cache_dir=args.cache_dir)
+
+
+def _add_lst_arguments(parser, errors=True, patch=True):
+    parser.add_argument("--forest", default="TOT", help="NF, BF, MF or TOT")
+    if patch:
+        parser.add_argument("--patch", default="220", help="220, 330 (cells) or 5km")
+        parser.add_argument("--suffix", default="", help="export name suffix, e.g. elev_diff100")
+    parser.add_argument("--lst-dir", nargs="+",
+                        help="LST export directories (default: DATA_DIR/LST_Diff and DATA_DIR/elev_diff100)")
+    parser.add_argument("--out-dir", help="summary CSVs (default: DATA_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="figure worker processes")
+    if errors:
+        parser.add_argument("--ci", choices=["iid", "block"], default=None,
+                            help="bootstrap intervals instead of the SE")
+        parser.add_argument("--weighting", choices=["count", "inverse_variance"], default=None,
+                            help="weight records by pixel count or inverse variance")
+
+
+def build_parser():
+    from .paths import DATA_DIR, GRAPH_DIR
+
+    parser = argparse.ArgumentParser(prog="forest-harvest", description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--graph-dir", default=str(GRAPH_DIR))
+    parser.add_argument("--cache-dir", help="default: DATA_DIR/.cache")
+    parser.add_argument("--show", action="store_true", default=None, help="show figures instead of only saving them")
+    parser.add_argument("--trace", metavar="PATH", help="record per-stage timings to PATH (.csv or JSON lines)")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    p = sub.add_parser("harvest-map", help="Figure 1a: summed harvest fraction map")
+    p.add_argument("--loss", help="loss stack (default: DATA_DIR/FinalLoss_at_20km_2023.tif)")
+    p.add_argument("--forest-raster", help="forest raster (default: DATA_DIR/Forest2000_at_20km_2023.tif)")
+    p.add_argument("--out", help="output PDF")
+    p.add_argument("--geographic", action="store_true", help="plot on the geographic grid, not the LAEA grid")
+    p.add_argument("--memory-budget-mb", type=int, default=256)
+    p.set_defaults(run=_harvest_map)
+
+    p = sub.add_parser("harvest-bars", help="Figure 1b: harvested area per region")
+    p.add_argument("--variant", default="loss_WIND_")
+    p.add_argument("--first-year", type=int, default=2004)
+    p.add_argument("--out", help="output PDF")
+    p.set_defaults(run=_harvest_bars)
+
+    p = sub.add_parser("harvest-types", help="Figure 1c: harvest share per forest type")
+    p.add_argument("--variant", default="Compact_loss_WIND")
+    p.add_argument("--years", nargs=2, type=int, default=[2004, 2023], metavar=("START", "END"))
+    p.add_argument("--out", help="output PDF")
+    p.set_defaults(run=_harvest_types)
+
+    p = sub.add_parser("lst-regions", help="Figures 2, 3, 6: seasonal LST change per region")
+    _add_lst_arguments(p)
+    p.set_defaults(run=_lst_figure("seasonal_barchart", ci=None, weighting=None))
+
+    p = sub.add_parser("lst-temporal", help="Figures 4, 5: daily LST by years after harvest")
+    _add_lst_arguments(p)
+    p.set_defaults(run=_lst_figure("effect_year_curves", ci=None, weighting=None))
+
+    p = sub.add_parser("lst-quantiles", help="pooled LST percentiles by years after harvest")
+    _add_lst_arguments(p, errors=False)
+    p.set_defaults(run=_lst_figure("effect_year_quantiles"))
+
+    p = sub.add_parser("lst-elevation", help="Figures 2 and 4 of all records against the elevation-controlled ones")
+    _add_lst_arguments(p)
+    p.set_defaults(run=_lst_elevation)
+
+    p = sub.add_parser("lst-resolutions", help="Figures 2 and 4 at several resolutions, against the first")
+    _add_lst_arguments(p, patch=False)
+    p.add_argument("--patches", nargs="+", default=["220", "330", "5km"], help="resolutions, the reference first")
+    p.set_defaults(run=_lst_resolutions)
+
+    # Their arguments are left unparsed and passed on
+    for name, (_, help_text) in MODULE_COMMANDS.items():
+        sub.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    # Before any other module binds the paths, so the pass-through subcommands use them too
+    from . import paths
+    paths.use_data_dir(args.data_dir)
+    paths.use_graph_dir(args.graph_dir)
+    if args.cache_dir:
+        paths.use_cache_dir(args.cache_dir)
+    args.cache_dir = str(paths.CACHE_DIR)
+    if args.trace:
+        from . import trace
+        trace.enable(args.trace)
+    if args.command in MODULE_COMMANDS:
+        module = importlib.import_module(MODULE_COMMANDS[args.command][0])
+        return module.main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if not args.show:
+        from .render import use_headless
+        use_headless()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    main()
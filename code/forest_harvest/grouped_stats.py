@@ -0,0 +1,150 @@
+"""Grouped count, mean, M2, standard deviation and standard error in one pass.
+
+``grouped_moments`` assigns every row a group code once and then gets all
+per-group sums with ``np.bincount``. The sums of squares are taken around
+the group means (not as ``sum(x**2) - n*mean**2``), so they stay accurate for
+values far from zero. Partial results, for example from chunks of a large
+frame, are combined with ``merge_moments`` using the Chan et al. update of
+Welford's algorithm.
+
+With ``weights`` the same pass also returns weighted moments. The weighted
+mean is ``sum(w x) / sum(w)``. Its error uses Kish's effective sample size
+``n_eff = sum(w)**2 / sum(w**2)``: the weighted variance is scaled by
+``n_eff / (n_eff - 1)`` and the SE is ``wstd / sqrt(n_eff)``. With equal
+weights this reduces to the unweighted ``std`` and ``se``.
+"""
+
+import numpy as np
+
+from .trace import traced
+
+STATS = ["count", "mean", "m2", "std", "se"]
+WEIGHTED_STATS = ["weight", "neff", "wmean", "wstd", "wse"]
+
+
+def _moments(codes, x, ngroups):
+    valid = ~np.isnan(x)
+    codes, x = codes[valid], x[valid]
+    count = np.bincount(codes, minlength=ngroups).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=x, minlength=ngroups) / count
+    dev = x - mean[codes]
+    m2 = np.bincount(codes, weights=dev * dev, minlength=ngroups)
+    return count, mean, m2
+
+
+def _weighted_moments(codes, x, w, ngroups):
+    valid = ~np.isnan(x) & np.isfinite(w)
+    codes, x, w = codes[valid], x[valid], w[valid]
+    weight = np.bincount(codes, weights=w, minlength=ngroups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=w * x, minlength=ngroups) / weight
+    dev = x - mean[codes]
+    m2 = np.bincount(codes, weights=w * dev * dev, minlength=ngroups)
+    return weight, mean, m2, np.bincount(codes, weights=w * w, minlength=ngroups)
+
+
+def finish_moments(count, mean, m2, ddof=1):
+    """Standard deviation and standard error from count and M2 (NaN where count <= ddof)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(m2 / (count - ddof))
+        std[count <= ddof] = np.nan
+        se = std / np.sqrt(count)
+    return std, se
+
+
+def finish_weighted_moments(weight, mean, m2, weight_sq):
+    """Kish effective size, weighted standard deviation and standard error (NaN where n_eff <= 1)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        neff = weight * weight / weight_sq
+        std = np.sqrt(m2 / weight * neff / (neff - 1))
+        std[~(neff > 1)] = np.nan
+        se = std / np.sqrt(neff)
+    return neff, std, se
+
+
+def merge_moments(a, b):
+    """Combine two ``(count, mean, m2)`` triples of the same groups.
+
+    Also merges weighted ``(weight, mean, m2)`` triples; the sums of squared
+    weights simply add.
+    """
+    count_a, mean_a, m2_a = a
+    count_b, mean_b, m2_b = b
+    count = count_a + count_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = mean_b - mean_a
+        mean = mean_a + delta * count_b / count
+        m2 = m2_a + m2_b + delta * delta * count_a * count_b / count
+    # Groups that are empty on one side take the other side as is
+    mean = np.where(count_a == 0, mean_b, np.where(count_b == 0, mean_a, mean))
+    m2 = np.where(count_a == 0, m2_b, np.where(count_b == 0, m2_a, m2))
+    return count, mean, m2
+
+
+def group_codes(df, by):
+    """Group code of every row (-1 for a missing key), number of groups and the key frame.
+
+    Codes follow the sorted ``groupby`` order; categorical keys keep only
+    observed combinations.
+    """
+    grouper = df.groupby(by, observed=True, sort=True)
+    codes = grouper.ngroup().to_numpy()
+    rows = np.flatnonzero(codes >= 0)
+
+    # Key values of each group from its first row
+    _, first = np.unique(codes[rows], return_index=True)
+    return codes, grouper.ngroups, df[by].iloc[rows[first]].reset_index(drop=True)
+
+
+@traced("groupby")
+def grouped_moments(df, by, values, ddof=1, chunk_rows=None, weights=None):
+    """Per-group moments of ``values`` as a tidy frame (one row per group).
+
+    ``by`` columns come first, sorted as ``groupby`` sorts them; categorical
+    keys keep only observed combinations and rows with a missing key are
+    dropped. For a single value column the statistics are named ``count``,
+    ``mean``, ``m2``, ``std`` and ``se``; for a list they are prefixed with the
+    column name (``Daily LST_mean``). NaN values are skipped and ``std`` uses
+    ``ddof`` like pandas. ``chunk_rows`` accumulates the rows in chunks of that
+    size and merges them, for frames whose temporaries would not fit in memory.
+
+    ``weights`` names the weight column of each value column (a string for a
+    single value, a list aligned with ``values`` otherwise). The weighted
+    ``weight``, ``neff``, ``wmean``, ``wstd`` and ``wse`` are then added in the
+    same pass. Rows with a non-finite weight only drop out of those.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    columns = [values] if isinstance(values, str) else list(values)
+    if weights is None:
+        weight_columns = [None] * len(columns)
+    else:
+        weight_columns = [weights] if isinstance(weights, str) else list(weights)
+
+    codes, ngroups, out = group_codes(df, by)
+    rows = np.flatnonzero(codes >= 0)
+
+    step = max(chunk_rows or len(rows), 1)
+    for column, weight_column in zip(columns, weight_columns):
+        x = df[column].to_numpy(dtype=np.float64)
+        w = None if weight_column is None else df[weight_column].to_numpy(dtype=np.float64)
+        acc = wacc = None
+        for start in range(0, max(len(rows), 1), step):
+            chunk = rows[start:start + step]
+            part = _moments(codes[chunk], x[chunk], ngroups)
+            acc = part if acc is None else merge_moments(acc, part)
+            if w is not None:
+                wpart = _weighted_moments(codes[chunk], x[chunk], w[chunk], ngroups)
+                wacc = wpart if wacc is None else (*merge_moments(wacc[:3], wpart[:3]), wacc[3] + wpart[3])
+
+        count, mean, m2 = acc
+        std, se = finish_moments(count, mean, m2, ddof)
+        prefix = "" if isinstance(values, str) else f"{column}_"
+        for name, stat in zip(STATS, (count.astype(np.int64), mean, m2, std, se)):
+            out[prefix + name] = stat
+        if wacc is not None:
+            weight, wmean, wm2, weight_sq = wacc
+            neff, wstd, wse = finish_weighted_moments(weight, wmean, wm2, weight_sq)
+            for name, stat in zip(WEIGHTED_STATS, (weight, neff, wmean, wstd, wse)):
+                out[prefix + name] = stat
+    return out
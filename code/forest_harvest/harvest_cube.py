@@ -0,0 +1,180 @@
+"""Consolidated country x year x loss variant x forest type harvest cube.
+
+The ``Country_Forest_Change_*`` exports are ~260 two-column CSVs spread over
+``DataGEE_FIRE_MED``, ``DataGEE_FIRE_TOT`` and ``DataGEE_FIRE_FORESTS``. They
+are read once into a tidy table (country, year, variant, forest, area_m2),
+which is kept as Feather under ``CACHE_DIR``. The table is rebuilt only when
+a file is added, removed or modified. ``HarvestCube`` holds it as a dense 4-D
+array, so figures slice it instead of re-reading files.
+
+Variants are the file-name part between ``Country_Forest_Change_`` and the
+country code (``loss``, ``TOTAL_loss``, ``loss_WIND_``, ``loss_WIND_ICL``,
+``Compact_loss_WIND`` ...). The per-forest-type exports
+``Compact_loss_{broad,Needle,Mix}_WIND`` are filed under variant
+``Compact_loss_WIND`` with that forest type; every other file has forest
+``all``.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .cache import HAVE_ARROW
+from .paths import CACHE_DIR, DATA_DIR
+from .schemas import read_country_csv
+from .trace import traced
+
+SOURCE_DIRS = ["DataGEE_FIRE_MED", "DataGEE_FIRE_TOT", "DataGEE_FIRE_FORESTS"]
+
+FOREST_TYPES = ["all", "broad", "Needle", "Mix"]
+
+_NAME = re.compile(r"^Country_Forest_Change_(?P<variant>.+?)_(?P<country>[A-Z]{2})\.csv$")
+_FOREST_VARIANT = re.compile(r"^(?P<head>.*)_(?P<forest>broad|Needle|Mix)_(?P<tail>.*)$")
+
+
+def parse_name(filename):
+    """Return (variant, forest, country) for an export file name, or None."""
+    m = _NAME.match(filename)
+    if not m:
+        return None
+    variant, forest = m.group("variant"), "all"
+    f = _FOREST_VARIANT.match(variant)
+    if f:
+        variant, forest = f"{f.group('head')}_{f.group('tail')}", f.group("forest")
+    return variant, forest, m.group("country")
+
+
+def _source_files(data_dir):
+    files = []
+    for sub in SOURCE_DIRS:
+        directory = os.path.join(data_dir, sub)
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                meta = parse_name(entry.name)
+                if meta is not None and entry.is_file():
+                    files.append((entry.path, meta))
+    return sorted(files)
+
+
+def _fingerprint(files):
+    h = hashlib.sha256()
+    for path, _ in files:
+        st = os.stat(path)
+        h.update(f"{path}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+@traced("harvest_table")
+def build_harvest_table(data_dir=DATA_DIR):
+    """Read every export into one tidy table, without caching."""
+    frames = []
+    for path, (variant, forest, country) in _source_files(data_dir):
+        df = read_country_csv(path)
+        frames.append(pd.DataFrame({
+            "country": country,
+            "year": df["year"],
+            "variant": variant,
+            "forest": forest,
+            "area_m2": df["Forest Loss Total"],
+        }))
+    table = pd.concat(frames, ignore_index=True)
+    for col in ("country", "variant"):
+        table[col] = table[col].astype("category")
+    table["forest"] = table["forest"].astype(pd.CategoricalDtype(FOREST_TYPES))
+    return table
+
+
+def load_harvest_table(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """``build_harvest_table``, served from the Feather copy while the sources are unchanged."""
+    files = _source_files(data_dir)
+    if not files:
+        raise FileNotFoundError(f"No Country_Forest_Change exports under {data_dir}")
+    if not HAVE_ARROW:
+        return build_harvest_table(data_dir)
+
+    data_path = os.path.join(cache_dir, "harvest_cube.feather")
+    meta_path = os.path.join(cache_dir, "harvest_cube.json")
+    fingerprint = _fingerprint(files)
+    if os.path.exists(data_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                return pd.read_feather(data_path)
+
+    table = build_harvest_table(data_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    table.to_feather(data_path + ".tmp")
+    os.replace(data_path + ".tmp", data_path)
+    with open(meta_path, "w") as f:
+        json.dump({"fingerprint": fingerprint, "files": len(files)}, f)
+    return table
+
+
+class HarvestCube:
+    """Harvested area (m2) as a dense ``(country, year, variant, forest)`` array.
+
+    Combinations without an export are NaN.
+    """
+
+    def __init__(self, values, countries, years, variants, forests):
+        self.values = values
+        self.countries = list(countries)
+        self.years = np.asarray(years)
+        self.variants = list(variants)
+        self.forests = list(forests)
+
+    @classmethod
+    def from_table(cls, table):
+        countries = sorted(table["country"].unique())
+        years = np.sort(table["year"].unique())
+        variants = sorted(table["variant"].unique())
+        forests = [f for f in FOREST_TYPES if f in set(table["forest"])]
+
+        values = np.full((len(countries), len(years), len(variants), len(forests)), np.nan)
+        idx = (
+            pd.Index(countries).get_indexer(table["country"]),
+            np.searchsorted(years, table["year"]),
+            pd.Index(variants).get_indexer(table["variant"]),
+            pd.Index(forests).get_indexer(table["forest"]),
+        )
+        values[idx] = table["area_m2"].to_numpy()
+        return cls(values, countries, years, variants, forests)
+
+    @staticmethod
+    def _positions(labels, selected):
+        if isinstance(selected, str):
+            return labels.index(selected)
+        return [labels.index(s) for s in selected]
+
+    def sel(self, countries=None, variants=None, forests=None, years=None):
+        """Slice the array by labels; a single label (not in a list) drops that axis."""
+        out = self.values
+        if years is not None:
+            out = np.compress(np.isin(self.years, years), out, axis=1)
+        # Last axis first, so dropping an axis does not shift the ones still to come
+        for axis, labels, selected in ((3, self.forests, forests), (2, self.variants, variants),
+                                       (0, self.countries, countries)):
+            if selected is not None:
+                out = np.take(out, self._positions(labels, selected), axis=axis)
+        return out
+
+    def frame(self, variant, forest="all", countries=None):
+        """Year x country table of one variant and forest type.
+
+        Requested countries without exports come back as NaN columns.
+        """
+        countries = self.countries if countries is None else list(countries)
+        present = [c for c in countries if c in self.countries]
+        data = self.sel(countries=present, variants=variant, forests=forest)
+        out = pd.DataFrame(data.T, index=pd.Index(self.years, name="year"), columns=present)
+        return out.reindex(columns=countries)
+
+
+def load_harvest_cube(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """The harvest exports under ``data_dir`` as a ``HarvestCube``."""
+    return HarvestCube.from_table(load_harvest_table(data_dir, cache_dir))
@@ -0,0 +1,195 @@
+"""Harvest figures shared by the figure scripts and the command line.
+
+``harvest_map`` is the body of Figure 1a (summed harvest fraction on a
+map), ``harvest_bars`` of Figure 1b (harvested area per region and year)
+and ``harvest_types`` of Figure 1c (share of each forest type). The map
+needs the geo stack (rasterio, rioxarray, cartopy); it is imported inside
+``harvest_map`` only, so the bar charts start without it.
+"""
+
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from . import render
+from .basemap import PLOT_BBOX
+from .paths import CACHE_DIR, DATA_DIR, GRAPH_DIR
+from .trace import traced
+
+LOSS_RASTER = "FinalLoss_at_20km_2023.tif"
+FOREST_RASTER = "Forest2000_at_20km_2023.tif"
+
+REGIONS_ORDER = ["Northern", "Western", "Southern", "Eastern"]
+REGION_COLORS = ['#228B22', '#87CEEB', '#E4A700', '#8B4513']
+
+# Forest type -> cube forest code, colour and label (Needleleaf=NF, Broadleaf=BF, Mixed=MF)
+FOREST_CODES = {"Broadleaf": "broad", "Needleleaf": "Needle", "Mixed": "Mix"}
+FOREST_COLORS = {"Needleleaf": "#59A14F", "Broadleaf": "#F28E2B", "Mixed": "#4E79A7"}
+FOREST_LABELS = {"Needleleaf": "NF", "Broadleaf": "BF", "Mixed": "MF"}
+FOREST_TYPES = ["Needleleaf", "Broadleaf", "Mixed"]
+
+
+@traced("harvest_map")
+def harvest_map(data_dir=DATA_DIR, graph_dir=GRAPH_DIR, cache_dir=CACHE_DIR, loss_path=None, forest_path=None,
+                out_path=None, equal_area=True, memory_budget_mb=256, show=None):
+    """Figure 1a: harvest fraction summed over 2003-2022, windthrow outliers removed.
+
+    The rasters default to ``LOSS_RASTER`` and ``FOREST_RASTER`` in
+    ``data_dir``. The sum is computed block by block within
+    ``memory_budget_mb`` and kept under ``cache_dir``. With ``equal_area`` it
+    is reprojected to the LAEA grid (with the cached pixel index) before
+    plotting. Returns the path of the PDF.
+    """
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+    import rioxarray as rxr
+
+    from . import basemap, trace
+    from .harvest_raster import harvest_fraction_sum
+    from .reproject import LAEA, reproject_raster
+
+    loss_path = os.path.join(data_dir, LOSS_RASTER) if loss_path is None else loss_path
+    forest_path = os.path.join(data_dir, FOREST_RASTER) if forest_path is None else forest_path
+    out_path = os.path.join(graph_dir, "Forest_loss_area_percentage.pdf") if out_path is None else out_path
+
+    # Harvest fraction per year, windthrow outliers removed, summed over 2003-2022 (bands 3-22). Zeros are NaN.
+    os.makedirs(cache_dir, exist_ok=True)
+    time_sum_path = harvest_fraction_sum(loss_path, forest_path,
+                                         os.path.join(cache_dir, "time_sum_final_loss_20km.tif"),
+                                         memory_budget_mb=memory_budget_mb)
+    data_crs = ccrs.PlateCarree()
+    if equal_area:
+        time_sum_path = reproject_raster(time_sum_path, os.path.join(cache_dir, "time_sum_final_loss_20km_laea.tif"),
+                                         LAEA, cache_dir=cache_dir)
+        data_crs = ccrs.LambertAzimuthalEqualArea(central_longitude=10, central_latitude=52,
+                                                  false_easting=4321000, false_northing=3210000,
+                                                  globe=ccrs.Globe(ellipse="GRS80"))
+
+    time_sum_final_loss = rxr.open_rasterio(time_sum_path).isel(band=0)
+
+    fig, ax = plt.subplots(figsize=(10, 8), subplot_kw={'projection': basemap.map_projection()})
+    ax.set_extent([PLOT_BBOX["min_x"], PLOT_BBOX["max_x"], PLOT_BBOX["min_y"], PLOT_BBOX["max_y"]],
+                  crs=ccrs.PlateCarree())
+
+    # Low harvest is not shown
+    time_sum_final_loss = time_sum_final_loss.where(time_sum_final_loss > 2)
+    with trace.stage("plot", pixels=time_sum_final_loss.size):
+        time_sum_final_loss.plot(
+            ax=ax,
+            transform=data_crs,
+            cmap="YlGn",
+            vmin=0, vmax=30,
+            cbar_kwargs={
+                "label": "Forest harvest area (%)",
+                "shrink": 0.8
+            }
+        )
+
+    # Map features from the local pre-projected store if it has been built
+    # (python -m forest_harvest.basemap --raster), otherwise from cartopy's Natural Earth download
+    if basemap.available():
+        basemap.add_basemap(ax, raster=True)
+    else:
+        with trace.stage("features"):
+            ax.add_feature(cfeature.BORDERS, linewidth=0.5, edgecolor='black')
+            ax.add_feature(cfeature.COASTLINE, linewidth=0.5)
+            ax.add_feature(cfeature.LAND, facecolor='lightgray', alpha=0.3)
+            ax.add_feature(cfeature.OCEAN, facecolor='lightblue', alpha=0.3)
+
+    # Gridlines (curved latitudes)
+    gl = ax.gridlines(crs=ccrs.PlateCarree(), draw_labels=False,
+                      linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
+    gl.top_labels = False
+    gl.right_labels = False
+
+    ax.set_title("Time Sum of Final Loss Over Time", fontsize=16)
+    render.finish(fig, out_path, show=show, format='pdf', bbox_inches="tight")
+    return out_path
+
+
+def _regional_cube(data_dir, cache_dir):
+    from . import regions
+    from .harvest_cube import load_harvest_cube
+
+    return regions.aggregate(load_harvest_cube(data_dir, cache_dir))
+
+
+@traced("harvest_bars")
+def harvest_bars(data_dir=DATA_DIR, graph_dir=GRAPH_DIR, cache_dir=CACHE_DIR, out_path=None, variant='loss_WIND_',
+                 first_year=2004, show=None):
+    """Figure 1b: harvested area (Mha) of each region and year as stacked bars; returns the PDF path."""
+    out_path = os.path.join(graph_dir, "Stacked_ForestHarvestByRegion.pdf") if out_path is None else out_path
+
+    # Yearly harvested area of each region, all regions aggregated in one pass (m2 -> Mha)
+    region_data = _regional_cube(data_dir, cache_dir).frame(variant)[REGIONS_ORDER] / 1e10
+    region_data = region_data.rename(columns=lambda r: f'{r} Europe').rename_axis('Year').reset_index()
+    region_data = region_data[region_data['Year'] >= first_year]
+
+    fig, ax = plt.subplots(figsize=(9, 6))
+    region_data.set_index('Year').plot(kind='bar', stacked=True, ax=ax, color=REGION_COLORS, width=0.75)
+
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Forest Harvest Area (Mha)")
+    ax.set_title("Forest Harvest in Europe by Region")
+    ax.legend(title="Region", loc="upper left")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+    plt.tight_layout()
+    render.finish(fig, out_path, show=show, format='pdf', bbox_inches="tight")
+    return out_path
+
+
+@traced("harvest_types")
+def harvest_types(data_dir=DATA_DIR, graph_dir=GRAPH_DIR, cache_dir=CACHE_DIR, out_path=None,
+                  variant="Compact_loss_WIND", year_start=2004, year_end=2023, show=None):
+    """Figure 1c: yearly share (%) of the harvest in each forest type, all regions together; returns the PDF path."""
+    out_path = (os.path.join(graph_dir, "ForestHarvest_Yearly_100pct_ForestTypeOnly.pdf")
+                if out_path is None else out_path)
+
+    # Year x region table per forest type, m2 -> Mha with the 0.85 correction factor
+    by_region = _regional_cube(data_dir, cache_dir)
+    tables = {forest: by_region.frame(variant, code)[REGIONS_ORDER].loc[year_start:year_end] / 1e10 / 0.85
+              for forest, code in FOREST_CODES.items()}
+    all_years = list(tables["Broadleaf"].index)
+
+    # Year x forest type, then percentages of the yearly total
+    F = pd.DataFrame(index=all_years)
+    for forest in FOREST_TYPES:
+        F[forest] = tables[forest].sum(axis=1).reindex(all_years).fillna(0.0)
+    total = F.sum(axis=1)
+    P = F.div(total, axis=0).fillna(0.0) * 100.0
+
+    fig, ax = plt.subplots(figsize=(9, 6))
+    x = np.arange(len(all_years))
+    bottom = np.zeros(len(all_years))
+    for forest in FOREST_TYPES:
+        vals = P[forest].values
+        ax.bar(x, vals, bottom=bottom, color=FOREST_COLORS[forest], edgecolor="white", linewidth=0.4,
+               label=FOREST_LABELS[forest], width=0.75)
+
+        # Label the dominant type
+        for i, v in enumerate(vals):
+            if v >= 50:
+                ax.text(x[i], bottom[i] + v / 2, f"{v:.0f}%", ha="center", va="center", fontsize=8)
+        bottom += vals
+
+    ax.set_ylim(0, 100)
+    ax.set_ylabel("Share of total harvest (%)")
+    ax.set_xlabel("Year")
+    ax.set_title("Harvest composition by forest type (all regions aggregated)")
+
+    # Reduce visual clutter for long time series
+    step = max(1, len(all_years) // 30)
+    tick_pos = np.arange(0, len(all_years), step)
+    ax.set_xticks(tick_pos)
+    ax.set_xticklabels([all_years[i] for i in tick_pos], rotation=45, ha="right")
+
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+    ax.legend(title="Forest type", ncol=3, loc="upper center", bbox_to_anchor=(0.5, 1.15))
+    ax.margins(x=0.01)
+
+    plt.tight_layout()
+    render.finish(fig, out_path, show=show, format="pdf", bbox_inches="tight")
+    return out_path
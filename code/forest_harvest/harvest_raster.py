@@ -0,0 +1,126 @@
+"""Out-of-core harvest-fraction pipeline of Figure 1a.
+
+The loss stack is read in blocks of whole rows, sized so that one block and
+its temporaries fit in a memory budget. Each block goes through the chain
+of the original in-memory script (harvest fraction ``rho``, median and MAD
+along the band axis, windthrow outlier mask, sum over 2003-2022). The
+per-pixel result is written to a GeoTIFF window by window. Every step is
+per-pixel along the band axis, so the output does not depend on the block
+size. All arithmetic is float32.
+"""
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from . import memo as stage_memo
+from . import trace
+from .robust_stats import band_stats
+
+# Band 0 of the loss stack is 2000; bands 3-22 are 2003-2022
+YEAR_BANDS = slice(3, 23)
+
+# Forest area of a fully forested 20 km pixel (m2 / 625, as in the script)
+FULL_FOREST = 640000
+
+# Rough number of band-stack sized float32 temporaries alive per block
+_TEMPORARIES = 5
+
+
+def rho_block(loss, forest):
+    """Harvest fraction (%) of one block as float32; zeros become NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = np.true_divide(loss, forest, dtype=np.float32)
+    rho *= 100
+    rho[rho == 0] = np.nan
+    return rho
+
+
+def outlier_mask(rho, forest, workers=None):
+    """Suspected windthrow: more than 3 MAD above the pixel's median, > 3 % and > 10 % forest.
+
+    The MAD is the median of absolute deviations from the median of the
+    valid years.
+    """
+    stats = band_stats(rho, workers=workers)
+    return (rho > stats.median + 3 * stats.mad) & (rho > 3) & (forest / FULL_FOREST > 0.1)
+
+
+def harvest_sum_block(loss, forest, year_bands=YEAR_BANDS, workers=None):
+    """Summed harvest fraction over ``year_bands`` for one block, outliers removed."""
+    rho = rho_block(loss, forest)
+    rho[outlier_mask(rho, forest, workers)] = np.nan
+    total = np.nansum(rho[year_bands], axis=0)
+    total[total == 0] = np.nan
+    return total
+
+
+def harvest_fraction_block(loss, forest, year_bands=YEAR_BANDS, workers=None):
+    """Yearly harvest fraction over ``year_bands`` for one block, outliers NaN.
+
+    Years without loss are 0 where there is forest (NaN in ``rho_block``),
+    so they count as observations of the pixel's series.
+    """
+    rho = rho_block(loss, forest)
+    rho[outlier_mask(rho, forest, workers)] = np.nan
+    rho = rho[year_bands]
+    rho[(loss[year_bands] == 0) & (forest > 0)] = 0
+    return rho
+
+
+def block_rows(bands, width, memory_budget_mb):
+    """Rows per block so that one block stays within ``memory_budget_mb``."""
+    row_bytes = bands * width * 4 * _TEMPORARIES
+    return max(1, int(memory_budget_mb * 2**20 // row_bytes))
+
+
+def row_windows(height, width, rows):
+    """Full-width windows of ``rows`` rows covering a raster."""
+    for row in range(0, height, rows):
+        yield Window(0, row, width, min(rows, height - row))
+
+
+def _sum_blocks(loss_src, forest_src, rows, year_bands, workers):
+    for window in row_windows(loss_src.height, loss_src.width, rows):
+        loss = loss_src.read(window=window)
+        forest = forest_src.read(1, window=window)
+        yield window, harvest_sum_block(loss, forest, year_bands, workers)
+
+
+def _assemble(blocks, shape):
+    out = np.empty(shape, dtype=np.float32)
+    for window, block in blocks:
+        out[window.row_off:window.row_off + window.height] = block
+    return out
+
+
+def harvest_fraction_sum(loss_path, forest_path, out_path, memory_budget_mb=256, year_bands=YEAR_BANDS,
+                         workers=None, memo=True):
+    """Run the Figure 1a chain block by block and write ``time_sum_final_loss``.
+
+    Only the first band of the forest raster is read. ``workers`` threads
+    share the band statistics of each block. With ``memo`` the summed band
+    is kept in the stage cache (``forest_harvest.memo``), keyed on the
+    code, the contents of both rasters and ``year_bands``. A re-run then
+    only writes it out. Returns ``out_path``.
+    """
+    with rasterio.open(loss_path) as loss_src, rasterio.open(forest_path) as forest_src, \
+            trace.stage("raster_chain", pixels=loss_src.width * loss_src.height):
+        if (loss_src.shape, loss_src.transform) != (forest_src.shape, forest_src.transform):
+            raise ValueError(f"{loss_path} and {forest_path} are not on the same grid")
+
+        profile = loss_src.profile.copy()
+        profile.update(count=1, dtype="float32", nodata=np.nan)
+
+        rows = min(loss_src.height, block_rows(loss_src.count, loss_src.width, memory_budget_mb))
+        blocks = _sum_blocks(loss_src, forest_src, rows, year_bands, workers)
+        if memo and stage_memo.enabled():
+            key = ("1", stage_memo.source_digest(harvest_fraction_sum), loss_path, forest_path, year_bands)
+            total = stage_memo.default_cache().get("harvest_fraction_sum", key,
+                                                   lambda: _assemble(blocks, loss_src.shape))
+            blocks = [(Window(0, 0, loss_src.width, loss_src.height), total)]
+
+        with rasterio.open(out_path, "w", **profile) as dst:
+            for window, block in blocks:
+                dst.write(block, 1, window=window)
+    return out_path
@@ -0,0 +1,111 @@
+"""Shared loader for the LST difference exports in ``data/LST_Diff``.
+
+Two export families are understood:
+
+* ``LST_Day_220cell_TOT_Summer.csv`` with ``LST_Day_mean`` etc. in degrees
+* the older ``lstDay_Diff_Statistics_noFire_noWind_TOT_220cells_Summer.csv``
+  with ``LST_Day_1km_mean`` etc. in MODIS digital numbers (scale 0.02)
+
+Both are returned with the variable prefix stripped from the statistics
+columns (``count``, ``mean``, ``p5`` ... ``p95``, ``stdDev``) and the values
+in degrees, so the figure scripts do not need to know which one they got.
+See ``schemas`` for the column types.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import trace
+from .cache import FrameCache
+from .catalog import get_catalog
+from .paths import CACHE_DIR, LST_DIRS
+from .schemas import read_lst_csv
+
+# Bump when read_lst_csv changes its output so stale cache entries are rebuilt
+CACHE_VERSION = "2"
+
+
+def _read_files(files, cache_dir, use_cache):
+    cache = FrameCache(os.path.join(cache_dir, "lst"), version=CACHE_VERSION)
+    frames = []
+    with trace.stage("read_csv") as current:
+        for item in files:
+            if use_cache:
+                key = os.path.splitext(os.path.basename(item.path))[0]
+                df = cache.get(key, item.path, lambda p: read_lst_csv(p, item.variable))
+            else:
+                df = read_lst_csv(item.path, item.variable)
+            frames.append(df)
+            current.count(rows=len(df))
+    df = pd.concat(frames, ignore_index=True)
+    # Per-file categories may differ; restore the categorical dtype after concat
+    for col in ("forest", "region"):
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _catalog(lst_dir):
+    """Catalog of one export directory, or of every existing directory in a list."""
+    if isinstance(lst_dir, (list, tuple)):
+        return get_catalog(*[d for d in lst_dir if os.path.isdir(d)])
+    return get_catalog(lst_dir)
+
+
+def load_lst(variable, forest, patch, suffix="", lst_dir=LST_DIRS, cache_dir=CACHE_DIR, use_cache=True):
+    """Load every season of one export as a single frame.
+
+    ``variable`` is ``"Day"``, ``"Night"`` or ``"Daily_Mean"``. Parsed files are
+    kept in a Feather cache under ``cache_dir`` and re-read only when the CSV
+    changes.
+    """
+    files = _catalog(lst_dir).files(variable, patch, forest, suffix)
+    if not files:
+        raise FileNotFoundError(
+            f"No LST_{variable} exports for forest={forest!r}, patch={patch!r} in {lst_dir}")
+    return _read_files(files, cache_dir, use_cache)
+
+
+def load_day_night(forest, patch, suffix="", lst_dir=LST_DIRS, cache_dir=CACHE_DIR, use_cache=True):
+    """Load the day and night exports of every season that has both.
+
+    ``lst_dir`` is one directory or a list of them; by default the main
+    exports and the elevation-controlled ones (``suffix="elev_diff100"``).
+    """
+    pairs = _catalog(lst_dir).pairs(patch, forest, suffix)
+    if not pairs:
+        raise FileNotFoundError(
+            f"No day/night exports for forest={forest!r}, patch={patch!r} in {lst_dir}")
+    day = _read_files([d for d, _ in pairs], cache_dir, use_cache)
+    night = _read_files([n for _, n in pairs], cache_dir, use_cache)
+    return day, night
+
+
+def prepare_lst(df, label, min_count, min_loss_year=None, keep=(), by=()):
+    """Copy ``mean`` into ``label``, add ``effectYear`` and apply the QC mask.
+
+    Cells with fewer than ``min_count`` valid pixels (and, if given, loss years
+    before ``min_loss_year``) are set to NaN rather than dropped. Columns in
+    ``keep`` (e.g. ``count``, ``stdDev``) are carried along as ``"{label} {column}"``
+    and columns in ``by`` (labels shared by day and night) under their own name.
+    """
+    out = pd.DataFrame({
+        label: df["mean"],
+        "season": df["season"],
+        "effectYear": df["analysisYear"] - df["lossYear"],
+        "region": df["region"],
+        "lossYear": df["lossYear"],
+        "analysisYear": df["analysisYear"],
+        "forest": df["forest"],
+    })
+    for column in keep:
+        out[f"{label} {column}"] = df[column]
+    for column in by:
+        out[column] = df[column]
+
+    bad = df["count"] < min_count
+    if min_loss_year is not None:
+        bad |= df["lossYear"] < min_loss_year
+    out.loc[bad, label] = np.nan
+    return out
@@ -0,0 +1,598 @@
+"""LST response figures shared by the figure scripts and the batch runner.
+
+``seasonal_barchart`` is the body of Figures 2, 3 and 6 (seasonal bar charts
+per region) and ``effect_year_curves`` the body of Figures 4 and 5 (daily LST
+by years after harvest). ``effect_year_quantiles`` is the distributional
+counterpart of Figures 4 and 5, built from the exported percentiles. Both take the day/night frames returned by
+``lst_data.load_day_night`` so one load can feed several figures. ``variant_comparison`` runs Figures 2 and 4 for
+several variants of the exports at once (``elevation_comparison``: all records against the elevation-controlled
+ones) and tabulates their differences.
+"""
+
+import os
+import warnings
+from collections import namedtuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from . import lst_data, render
+from .bootstrap import grouped_bootstrap_ci
+from .catalog import patch_label
+from .grouped_stats import group_codes, grouped_moments
+from .memo import memoised
+from .pairing import PAIR_KEYS, pair_day_night
+from .quantile_sketch import QUANTILE_COLUMNS, grouped_sketch, value_grid
+from .paths import CACHE_DIR, DATA_DIR, ELEV_SUFFIX, GRAPH_DIR, LST_DIRS
+from .trace import traced
+
+SEASONS_TO_PLOT = ['Spring', 'Summer', 'Autumn', 'Winter', 'Annual']
+
+# Summary column prefix -> LST column
+LST_COLUMNS = {'daytime': 'Daytime LST', 'nighttime': 'Nighttime LST', 'daily': 'Daily LST'}
+
+# Bootstrap intervals: ci="iid" resamples cohorts independently, ci="block"
+# in circular blocks of consecutive years
+CI_BLOCKS = {'iid': None, 'block': 3}
+BOOTSTRAP_REPLICATES = 10000
+BOOTSTRAP_SEED = 0
+
+# Record weighting: None (equal weights), pixel count, or the inverse variance
+# of the cell mean (stdDev**2 / count)
+WEIGHTINGS = ['count', 'inverse_variance']
+
+# Define season colors (natural tones)
+SEASON_COLORS = {
+    'Spring': '#66c2a5',  # Fresh Green
+    'Summer': '#fc8d62',  # Warm Orange
+    'Autumn': '#8da0cb',  # Cool Blue
+    'Winter': '#e78ac3',  # Soft Pink
+    'Annual': '#a6d854'   # Bright Green
+}
+
+
+def patch_tag(patch):
+    """File-name tag of a patch as used in the outputs (``220`` -> ``220cells``)."""
+    patch = patch_label(patch)
+    return patch + "s" if patch.endswith("cell") else patch
+
+
+def _add_weights(data, weighting):
+    """Add a ``'{label} weight'`` column for the day, night and daily LST of every record."""
+    if weighting == 'count':
+        day, night = data['Daytime LST count'], data['Nighttime LST count']
+        daily = (day + night) / 2
+    else:
+        var_day = data['Daytime LST stdDev'] ** 2 / data['Daytime LST count']
+        var_night = data['Nighttime LST stdDev'] ** 2 / data['Nighttime LST count']
+        # The daily mean (day + night) / 2 has a quarter of the summed variance
+        day, night, daily = 1 / var_day, 1 / var_night, 4 / (var_day + var_night)
+
+    for label, weight in (('Daytime LST', day), ('Nighttime LST', night), ('Daily LST', daily)):
+        weight = weight.astype(np.float64)
+        data[f'{label} weight'] = weight.where(np.isfinite(weight))
+
+
+def _weight_columns(labels, weighting):
+    """Weight column of each LST label for ``grouped_moments`` (None when unweighted)."""
+    if weighting is None:
+        return None
+    return [f'{label} weight' for label in labels]
+
+
+@memoised('paired_daily_lst')
+def paired_daily_lst(day_df, night_df, min_count, min_loss_year=None, weighting=None, keep=(), by=()):
+    """QC, pair and average the day and night records, keeping effect years 1-20.
+
+    With ``weighting`` (one of ``WEIGHTINGS``) every record also gets
+    ``'{label} weight'`` columns for the day, night and daily LST. Export
+    columns in ``keep`` are carried along as in ``lst_data.prepare_lst``.
+    Columns in ``by`` (e.g. ``variant`` of stacked exports) are carried
+    along and become part of the pairing key.
+    """
+    if weighting is not None and weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting {weighting!r}; choose from {WEIGHTINGS}")
+    if weighting is not None:
+        keep = tuple(dict.fromkeys((*keep, 'count', 'stdDev')))
+    combined_day_data = lst_data.prepare_lst(day_df, 'Daytime LST', min_count, min_loss_year, keep, by)
+    combined_night_data = lst_data.prepare_lst(night_df, 'Nighttime LST', min_count, min_loss_year, keep, by)
+
+    # Pair day and night records one-to-one on lossYear, analysisYear, region, season and forest
+    combined_data = pair_day_night(combined_day_data, combined_night_data, keys=PAIR_KEYS + list(by))
+
+    # Calculate daily mean as (Daytime LST + Nighttime LST) / 2
+    combined_data['Daily LST'] = (combined_data['Daytime LST'] + combined_data['Nighttime LST']) / 2
+    if weighting is not None:
+        _add_weights(combined_data, weighting)
+
+    # Filter the data for effectYear from 1 to 20
+    return combined_data[(combined_data['effectYear'] >= 1) & (combined_data['effectYear'] <= 20)]
+
+
+def _bootstrap_options(ci):
+    if ci not in CI_BLOCKS:
+        raise ValueError(f"Unknown ci {ci!r}; choose from {sorted(CI_BLOCKS)}")
+    return dict(block=CI_BLOCKS[ci], n_boot=BOOTSTRAP_REPLICATES, seed=BOOTSTRAP_SEED)
+
+
+def _yerr(summary, name):
+    """Error bars of one bar series: the bootstrap interval if present, else the SE."""
+    if f'{name}_ci_low' not in summary:
+        return summary[f'{name}_se']
+    mean = summary[f'{name}_mean']
+    return [mean - summary[f'{name}_ci_low'], summary[f'{name}_ci_high'] - mean]
+
+
+def _draw_barchart(summary):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    x = np.arange(len(SEASONS_TO_PLOT))  # X-axis positions
+    bar_width = 0.20  # Width of each bar
+
+    # Plot Daytime, Nighttime, and Daily Mean bars
+    ax.bar(
+        x, summary['nighttime_mean'], width=bar_width,
+        yerr=_yerr(summary, 'nighttime'), label='Nighttime LST', capsize=5
+    )
+    ax.bar(
+        x - bar_width, summary['daytime_mean'], width=bar_width,
+        yerr=_yerr(summary, 'daytime'), label='Daytime LST', capsize=5
+    )
+    ax.bar(
+        x + bar_width, summary['daily_mean'], width=bar_width,
+        yerr=_yerr(summary, 'daily'), label='Daily Mean LST', capsize=5
+    )
+
+    ax.axhline(y=0, linestyle='--', color='black')
+
+    # Set the custom x-ticks labels
+    ax.set_xticks(x)
+    ax.set_xticklabels(SEASONS_TO_PLOT)
+
+    fig.tight_layout()
+
+    # Add legend
+    ax.legend(loc='upper right')
+    return fig
+
+
+def seasonal_stats(filtered_data, weighting=None, ci=None, by=()):
+    """Seasonal statistics of Figures 2/3/6 per ``by`` columns, region and season.
+
+    Every effect year is averaged first; the ``{name}_mean``, ``_std``,
+    ``_count`` and ``_se`` columns (``name`` a key of ``LST_COLUMNS``)
+    describe those averages, plus ``_ci_low``/``_ci_high`` with ``ci``.
+    Returns the statistics and the names of their error columns.
+    """
+    keys = list(by) + ['region', 'season']
+
+    # Calculate the average for every effect year
+    mean = 'mean' if weighting is None else 'wmean'
+    effect_year_avg = grouped_moments(
+        filtered_data, keys + ['effectYear'], list(LST_COLUMNS.values()),
+        weights=_weight_columns(LST_COLUMNS.values(), weighting)
+    ).rename(columns={f'{column}_{mean}': f'{name}_avg' for name, column in LST_COLUMNS.items()})
+
+    # Means, standard deviations, counts and standard errors of every region and season
+    stats = grouped_moments(effect_year_avg, keys, [f'{name}_avg' for name in LST_COLUMNS])
+    stats = stats.rename(columns=lambda c: c.replace('_avg_', '_'))
+    error_columns = [f'{name}_se' for name in LST_COLUMNS]
+
+    if ci is not None:
+        bounds = grouped_bootstrap_ci(effect_year_avg, keys, [f'{name}_avg' for name in LST_COLUMNS],
+                                      order='effectYear', **_bootstrap_options(ci))
+        for name in LST_COLUMNS:
+            for side in ('ci_low', 'ci_high'):
+                stats[f'{name}_{side}'] = bounds[f'{name}_avg_{side}']
+                error_columns.append(f'{name}_{side}')
+    return stats, error_columns
+
+
+def _output_tag(patch, weighting=None, suffix=''):
+    return patch_tag(patch) + ('' if weighting is None else f'_{weighting}') + (f'_{suffix}' if suffix else '')
+
+
+@traced("barchart")
+def seasonal_barchart(day_df, night_df, forest, patch, data_dir=DATA_DIR, graph_dir=GRAPH_DIR,
+                      show=None, workers=None, ci=None, weighting=None, suffix=''):
+    """Figures 2/3/6: mean seasonal LST change per region with standard errors.
+
+    ``show`` and ``workers`` are passed to ``render.render_figures``. With
+    ``ci`` (a key of ``CI_BLOCKS``) the error bars are 95 % bootstrap
+    intervals over the effect years instead of the SE, and the summary CSVs
+    gain ``*_ci_low``/``*_ci_high`` columns. With ``weighting`` (one of
+    ``WEIGHTINGS``) the effect-year averages are weighted means of the
+    records and the outputs are tagged with the weighting. A ``suffix``
+    (e.g. ``elev_diff100`` for the elevation-controlled exports) is added
+    to the output names.
+    """
+    tag = _output_tag(patch, weighting, suffix)
+
+    # Set LST to NaN if count is less than 40
+    filtered_data = paired_daily_lst(day_df, night_df, min_count=40, weighting=weighting)
+
+    # Define the regions
+    regions = filtered_data['region'].unique()
+
+    stats, error_columns = seasonal_stats(filtered_data, weighting, ci)
+    summary_columns = [f'{name}_{stat}' for name in LST_COLUMNS for stat in ('mean', 'std', 'count')]
+
+    # Summarise each region, then draw all region plots
+    jobs = []
+    for region in regions:
+        region_stats = stats[stats['region'] == region].set_index('season')
+        summary = region_stats[summary_columns + error_columns].reindex(SEASONS_TO_PLOT)  # Ensure correct seasonal order
+
+        summary.to_csv(os.path.join(data_dir, f'Forest_change_LST_diff_barchart_{forest}_{tag}_{region}.csv'))
+
+        pltname = f'Forest_change_LST_diff_barchart_{forest}_{tag}_{region}.pdf'
+        jobs.append((os.path.join(graph_dir, pltname), (summary,)))
+
+    render.render_figures(_draw_barchart, jobs, show=show, workers=workers, format='pdf')
+
+
+def _draw_effect_years(results_df, region):
+    fig = plt.figure(figsize=(12, 8))
+
+    bootstrap = 'ci_low_daily' in results_df
+    for season in SEASONS_TO_PLOT:
+        season_results = results_df[results_df['season'] == season]
+        effect_years = season_results['effectYear']
+        mean_daily = season_results['mean_daily']
+        if bootstrap:
+            low, high, band = season_results['ci_low_daily'], season_results['ci_high_daily'], '95% CI'
+        else:
+            se_daily = season_results['se_daily']
+            low, high, band = mean_daily - se_daily, mean_daily + se_daily, 'SE'
+
+        # Get season color
+        color = SEASON_COLORS.get(season, '#000000')
+
+        # Plot Daily LST with standard error (or bootstrap interval) shading
+        plt.plot(effect_years, mean_daily, label=f'{season} Daily LST', color=color, linestyle='-', marker='o')
+        plt.fill_between(effect_years, low, high, color=color, alpha=0.2, label=f'{season} {band}')
+
+    # Customize the plot
+    plt.title(f'Daily Mean LST by Effect Year for {region}')
+    plt.xlabel('Years after forest harvesting')
+    plt.ylabel('Daily LST (°C)')
+    plt.xticks(range(1, 21))  # Effect years from 1 to 20
+    plt.legend()
+    plt.axhline(y=0, linestyle='--', color='black')
+    return fig
+
+
+def effect_year_stats(filtered_data, weighting=None, ci=None, by=()):
+    """Daily LST statistics of Figures 4/5 per ``by`` columns, region, season and effect year.
+
+    Returns the statistics (``mean_daily``, ``se_daily``, plus ``neff_daily``
+    with ``weighting`` and ``ci_low_daily``/``ci_high_daily`` with ``ci``) of
+    the seasons in ``SEASONS_TO_PLOT`` and the names of the output columns.
+    """
+    keys = list(by) + ['region', 'season', 'effectYear']
+    weights = _weight_columns(['Daily LST'], weighting)
+    stats = grouped_moments(filtered_data, keys, ['Daily LST'], weights=weights)
+    if weighting is None:
+        stats = stats.rename(columns={'Daily LST_mean': 'mean_daily', 'Daily LST_se': 'se_daily'})
+        columns = keys + ['mean_daily', 'se_daily']
+    else:
+        stats = stats.rename(columns={'Daily LST_wmean': 'mean_daily', 'Daily LST_wse': 'se_daily',
+                                      'Daily LST_neff': 'neff_daily'})
+        columns = keys + ['mean_daily', 'se_daily', 'neff_daily']
+
+    if ci is not None:
+        bounds = grouped_bootstrap_ci(filtered_data, keys, ['Daily LST'], order='lossYear', weights=weights,
+                                      **_bootstrap_options(ci))
+        stats['ci_low_daily'], stats['ci_high_daily'] = bounds['Daily LST_ci_low'], bounds['Daily LST_ci_high']
+        columns += ['ci_low_daily', 'ci_high_daily']
+    return stats[stats['season'].isin(SEASONS_TO_PLOT)], columns
+
+
+def _effect_year_subset(combined_data, min_count=None, min_loss_year=None, ignore=()):
+    """The records of Figures 4/5: paired records without NaN in any column but those in ``ignore``.
+
+    With ``min_count`` or ``min_loss_year`` the QC of ``paired_daily_lst`` is
+    applied again first, so the records can come from a pairing at a lower
+    ``min_count`` that kept the ``count`` columns.
+    """
+    data = combined_data
+    if min_count is not None or min_loss_year is not None:
+        data = data.copy()
+        for label in ('Daytime LST', 'Nighttime LST'):
+            bad = np.zeros(len(data), dtype=bool)
+            if min_count is not None:
+                bad |= (data[f'{label} count'] < min_count).to_numpy()
+            if min_loss_year is not None:
+                bad |= (data['lossYear'] < min_loss_year).to_numpy()
+            data.loc[bad, label] = np.nan
+        data['Daily LST'] = (data['Daytime LST'] + data['Nighttime LST']) / 2
+    return data.dropna(subset=[column for column in data.columns if column not in ignore])
+
+
+@traced("effect_years")
+def effect_year_curves(day_df, night_df, forest, patch, data_dir=DATA_DIR, graph_dir=GRAPH_DIR,
+                       show=None, workers=None, ci=None, weighting=None, suffix=''):
+    """Figures 4/5: daily LST by years after harvest, one curve per season.
+
+    ``show`` and ``workers`` are passed to ``render.render_figures``. With
+    ``ci`` (a key of ``CI_BLOCKS``) the shading is a 95 % bootstrap interval
+    over the loss-year cohorts instead of the SE, and the CSVs gain
+    ``ci_low_daily``/``ci_high_daily`` columns. With ``weighting`` (one of
+    ``WEIGHTINGS``) the curves are weighted means with Kish effective-size
+    errors, the CSVs gain ``neff_daily`` and the outputs are tagged with the
+    weighting. A ``suffix`` is added to the output names. The records
+    behind the curves are saved as ``{forest}_{patch}.csv`` in ``data_dir``.
+    """
+    tag = _output_tag(patch, weighting, suffix)
+
+    # Set LST to NaN before 2003 or if count is less than 50
+    filtered_data = paired_daily_lst(day_df, night_df, min_count=50, min_loss_year=2003, weighting=weighting)
+    filtered_data = _effect_year_subset(filtered_data)
+
+    records = f'{forest}_{patch_label(patch)}' + (f'_{suffix}' if suffix else '') + '.csv'
+    filtered_data.to_csv(os.path.join(data_dir, records))
+
+    # Define the regions
+    regions = filtered_data['region'].unique()
+
+    # Mean and standard error of every region, season and effect year in one pass
+    stats, columns = effect_year_stats(filtered_data, weighting, ci)
+
+    # Draw all region plots
+    jobs = []
+    for region in regions:
+        results_df = stats.loc[stats['region'] == region, columns]
+
+        # Save as CSV
+        csv_filename = os.path.join(data_dir, f'LST_Daily_Mean_{forest}_{tag}_{region}.csv')
+        results_df.to_csv(csv_filename, index=False)
+
+        pltname = f'Forest_change_LST_diff_effectyears_dailymean_{forest}_{tag}_{region}.pdf'
+        jobs.append((os.path.join(graph_dir, pltname), (results_df, region)))
+
+    render.render_figures(_draw_effect_years, jobs, show=show, workers=workers, format='pdf')
+
+
+# Pooled quantiles reported by effect_year_quantiles, and their column names
+POOLED_QUANTILES = {'p5_daily': 0.05, 'p25_daily': 0.25, 'median_daily': 0.5, 'p75_daily': 0.75,
+                    'p95_daily': 0.95}
+
+
+def _draw_effect_year_quantiles(results_df, region):
+    fig = plt.figure(figsize=(12, 8))
+
+    for season in SEASONS_TO_PLOT:
+        season_results = results_df[results_df['season'] == season]
+        effect_years = season_results['effectYear']
+        color = SEASON_COLORS.get(season, '#000000')
+
+        # Pooled median with the inter-quartile band
+        plt.plot(effect_years, season_results['median_daily'], label=f'{season} median', color=color,
+                 linestyle='-', marker='o')
+        plt.fill_between(effect_years, season_results['p25_daily'], season_results['p75_daily'], color=color,
+                         alpha=0.2, label=f'{season} IQR')
+
+    plt.title(f'Pooled daily LST distribution by Effect Year for {region}')
+    plt.xlabel('Years after forest harvesting')
+    plt.ylabel('Daily LST (°C)')
+    plt.xticks(range(1, 21))
+    plt.legend()
+    plt.axhline(y=0, linestyle='--', color='black')
+    return fig
+
+
+@traced("effect_year_quantiles")
+def effect_year_quantiles(day_df, night_df, forest, patch, data_dir=DATA_DIR, graph_dir=GRAPH_DIR,
+                          show=None, workers=None, bins=400, suffix=''):
+    """Pooled pixel quantiles of the daily LST change by years after harvest.
+
+    Same records and QC as ``effect_year_curves``. Each record's exported
+    percentiles become a histogram sketch weighted by its pixel count
+    (``quantile_sketch``). The sketches are merged per region, season and
+    effect year, and ``POOLED_QUANTILES`` is read off the merged sketches.
+    The daily percentiles of a record are the means of its day and night
+    percentiles. This is exact when day and night pixels keep their rank
+    order, and an approximation otherwise. A ``suffix`` is added to the
+    output names.
+    """
+    tag = _output_tag(patch, suffix=suffix)
+    columns = [c for c in QUANTILE_COLUMNS if c in day_df.columns and c in night_df.columns]
+    probs = [QUANTILE_COLUMNS[c] for c in columns]
+
+    # Set LST to NaN before 2003 or if count is less than 50
+    filtered_data = paired_daily_lst(day_df, night_df, min_count=50, min_loss_year=2003,
+                                     keep=('count', *columns))
+    filtered_data = _effect_year_subset(filtered_data, ignore=[f'{label} {column}' for label in LST_COLUMNS.values()
+                                                               for column in ('count', *columns)])
+
+    quantiles = np.column_stack([
+        (filtered_data[f'Daytime LST {c}'].to_numpy(np.float64) + filtered_data[f'Nighttime LST {c}']) / 2
+        for c in columns
+    ])
+    counts = (filtered_data['Daytime LST count'] + filtered_data['Nighttime LST count']).to_numpy() / 2
+
+    keys = ['region', 'season', 'effectYear']
+    codes, ngroups, stats = group_codes(filtered_data, keys)
+    sketch = grouped_sketch(quantiles, probs, counts, codes, ngroups, value_grid(quantiles, probs, bins))
+    for name, value in zip(POOLED_QUANTILES, sketch.quantile(list(POOLED_QUANTILES.values())).T):
+        stats[name] = value
+    stats['pixels'] = sketch.total
+    stats = stats[stats['season'].isin(SEASONS_TO_PLOT)]
+
+    # Draw all region plots
+    jobs = []
+    for region in filtered_data['region'].unique():
+        results_df = stats[stats['region'] == region]
+
+        csv_filename = os.path.join(data_dir, f'LST_Daily_Quantiles_{forest}_{tag}_{region}.csv')
+        results_df.to_csv(csv_filename, index=False)
+
+        pltname = f'Forest_change_LST_diff_effectyears_quantiles_{forest}_{tag}_{region}.pdf'
+        jobs.append((os.path.join(graph_dir, pltname), (results_df, region)))
+
+    render.render_figures(_draw_effect_year_quantiles, jobs, show=show, workers=workers, format='pdf')
+
+
+# Line style of each variant in the comparison plots, in variant order
+VARIANT_STYLES = ['-', '--', ':', '-.']
+
+Comparison = namedtuple('Comparison', 'seasonal effect_years seasonal_diff effect_year_diff')
+
+
+def _variant_differences(stats, keys, names, variants):
+    """Mean of every variant minus the first (reference) variant, with the SE of the difference."""
+    reference = stats[stats['variant'] == variants[0]].drop(columns='variant')
+    columns = [f'{name}_{stat}' for name in names for stat in ('mean', 'se')]
+    tables = []
+    for variant in variants[1:]:
+        other = stats[stats['variant'] == variant].drop(columns='variant')
+        both = other[keys + columns].merge(reference[keys + columns], on=keys, suffixes=('', '_ref'))
+        table = both[keys].assign(variant=variant)
+        for name in names:
+            table[f'{name}_diff'] = both[f'{name}_mean'] - both[f'{name}_mean_ref']
+            table[f'{name}_diff_se'] = np.sqrt(both[f'{name}_se'] ** 2 + both[f'{name}_se_ref'] ** 2)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+
+def _draw_variant_comparison(seasonal, effect_years, region, variants):
+    fig, (ax_bars, ax_years) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Daily mean LST per season, the variants side by side
+    x = np.arange(len(SEASONS_TO_PLOT))
+    bar_width = 0.8 / len(variants)
+    for i, variant in enumerate(variants):
+        summary = seasonal[seasonal['variant'] == variant].set_index('season').reindex(SEASONS_TO_PLOT)
+        ax_bars.bar(x + (i - (len(variants) - 1) / 2) * bar_width, summary['daily_mean'], width=bar_width,
+                    yerr=_yerr(summary, 'daily'), label=variant, capsize=5)
+    ax_bars.axhline(y=0, linestyle='--', color='black')
+    ax_bars.set_xticks(x)
+    ax_bars.set_xticklabels(SEASONS_TO_PLOT)
+    ax_bars.set_ylabel('Daily LST (°C)')
+    ax_bars.legend(loc='upper right')
+
+    # Daily LST by effect year, one colour per season and one line style per variant
+    for season in SEASONS_TO_PLOT:
+        color = SEASON_COLORS.get(season, '#000000')
+        for variant, style in zip(variants, VARIANT_STYLES):
+            results = effect_years[(effect_years['variant'] == variant) & (effect_years['season'] == season)]
+            ax_years.plot(results['effectYear'], results['mean_daily'], color=color, linestyle=style, marker='o',
+                          markersize=3, label=f'{season} {variant}')
+    ax_years.set_xlabel('Years after forest harvesting')
+    ax_years.set_xticks(range(1, 21))
+    ax_years.axhline(y=0, linestyle='--', color='black')
+    ax_years.legend(ncol=2, fontsize=8)
+
+    fig.suptitle(f'Daily Mean LST change for {region}: {" vs ".join(variants)}')
+    fig.tight_layout()
+    return fig
+
+
+@traced("variant_comparison")
+def variant_comparison(variants, forest, name, tag='', data_dir=DATA_DIR, graph_dir=GRAPH_DIR, show=None,
+                       workers=None, ci=None, weighting=None):
+    """Figures 2 and 4 for several variants of the exports in one pass, with their differences.
+
+    ``variants`` maps a label to the ``(day_df, night_df)`` frames of one
+    variant; the first is the reference. The frames are stacked and paired
+    once, the seasonal and effect-year statistics of all variants come from
+    one grouped pass each, and the effect-year records are derived from the
+    seasonal pairing. Writes, named after ``name`` and ``tag`` (e.g. the patch):
+    - the seasonal and effect-year statistics of every variant (long CSVs
+      with a ``variant`` column; per variant they equal the outputs of
+      ``seasonal_barchart`` and ``effect_year_curves``);
+    - their differences from the reference, ``*_diff`` with ``*_diff_se``
+      from the two standard errors;
+    - one plot per region with the variants side by side.
+    Returns these tables as a ``Comparison``.
+    """
+    labels = list(variants)
+    if len(labels) < 2:
+        raise ValueError("Need at least two variants to compare")
+    tag = '_'.join(part for part in (forest, tag, weighting) if part)
+
+    # Stack the variants and pair them once
+    day_df = pd.concat([day.assign(variant=label) for label, (day, _) in variants.items()], ignore_index=True)
+    night_df = pd.concat([night.assign(variant=label) for label, (_, night) in variants.items()],
+                         ignore_index=True)
+    seasonal_data = paired_daily_lst(day_df, night_df, min_count=40, weighting=weighting, keep=('count',),
+                                     by=('variant',))
+    # The counts are only kept for this subset; the standalone figure has them only when weighting
+    counts = () if weighting is not None else ['Daytime LST count', 'Nighttime LST count']
+    effect_year_data = _effect_year_subset(seasonal_data, min_count=50, min_loss_year=2003, ignore=counts)
+
+    seasonal, _ = seasonal_stats(seasonal_data, weighting, ci, by=['variant'])
+    seasonal = seasonal[seasonal['season'].isin(SEASONS_TO_PLOT)]
+    effect_years, columns = effect_year_stats(effect_year_data, weighting, ci, by=['variant'])
+    effect_years = effect_years[columns]
+
+    seasonal_diff = _variant_differences(seasonal, ['region', 'season'], list(LST_COLUMNS), labels)
+    effect_year_diff = _variant_differences(
+        effect_years.rename(columns={'mean_daily': 'daily_mean', 'se_daily': 'daily_se'}),
+        ['region', 'season', 'effectYear'], ['daily'], labels)
+
+    base = f'LST_{name}_comparison_{tag}'
+    seasonal.to_csv(os.path.join(data_dir, f'{base}_seasonal.csv'), index=False)
+    effect_years.to_csv(os.path.join(data_dir, f'{base}_effectyears.csv'), index=False)
+    seasonal_diff.to_csv(os.path.join(data_dir, f'{base}_seasonal_diff.csv'), index=False)
+    effect_year_diff.to_csv(os.path.join(data_dir, f'{base}_effectyears_diff.csv'), index=False)
+
+    # Draw all region plots
+    jobs = []
+    for region in seasonal_data['region'].unique():
+        pltname = f'Forest_change_LST_diff_{name}_comparison_{tag}_{region}.pdf'
+        jobs.append((os.path.join(graph_dir, pltname),
+                     (seasonal[seasonal['region'] == region], effect_years[effect_years['region'] == region],
+                      region, labels)))
+
+    render.render_figures(_draw_variant_comparison, jobs, show=show, workers=workers, format='pdf')
+    return Comparison(seasonal, effect_years, seasonal_diff, effect_year_diff)
+
+
+def elevation_comparison(forest="TOT", patch="220", data_dir=DATA_DIR, graph_dir=GRAPH_DIR, show=None,
+                         workers=None, ci=None, weighting=None, suffix=ELEV_SUFFIX, lst_dir=LST_DIRS,
+                         cache_dir=CACHE_DIR):
+    """Figures 2 and 4 of all records against the elevation-controlled exports (``suffix``)."""
+    variants = {
+        'baseline': lst_data.load_day_night(forest, patch, lst_dir=lst_dir, cache_dir=cache_dir),
+        suffix: lst_data.load_day_night(forest, patch, suffix, lst_dir=lst_dir, cache_dir=cache_dir),
+    }
+    return variant_comparison(variants, forest, 'elevation', patch_tag(patch), data_dir, graph_dir, show=show,
+                              workers=workers, ci=ci, weighting=weighting)
+
+
+# Resolutions of the exports, the first the reference of the comparison
+RESOLUTIONS = ['220cell', '330cell', '5km']
+
+
+def resolution_comparison(forest="TOT", patches=RESOLUTIONS, data_dir=DATA_DIR, graph_dir=GRAPH_DIR, show=None,
+                          workers=None, ci=None, weighting=None, lst_dir=LST_DIRS, cache_dir=CACHE_DIR):
+    """Figures 2 and 4 at every resolution in ``patches``, against the first one.
+
+    The exports of every resolution are read through ``lst_data``, which
+    brings them to one schema. Resolutions without exports for ``forest``
+    are skipped with a warning. Besides the outputs of
+    ``variant_comparison`` (tagged ``resolution``), writes the range of the
+    seasonal means over the resolutions.
+    """
+    variants = {}
+    for patch in patches:
+        try:
+            variants[patch_label(patch)] = lst_data.load_day_night(forest, patch, lst_dir=lst_dir,
+                                                                   cache_dir=cache_dir)
+        except FileNotFoundError as exc:
+            warnings.warn(f"Skipping resolution {patch_label(patch)}: {exc}", stacklevel=2)
+    comparison = variant_comparison(variants, forest, 'resolution', '', data_dir, graph_dir, show=show,
+                                    workers=workers, ci=ci, weighting=weighting)
+
+    # Spread of the seasonal means over the resolutions
+    means = comparison.seasonal.pivot_table(index=['region', 'season'], columns='variant', sort=False,
+                                 values=[f'{name}_mean' for name in LST_COLUMNS])
+    spread = pd.DataFrame(index=means.index)
+    for name in LST_COLUMNS:
+        spread[f'{name}_min'] = means[f'{name}_mean'].min(axis=1)
+        spread[f'{name}_max'] = means[f'{name}_mean'].max(axis=1)
+        spread[f'{name}_range'] = spread[f'{name}_max'] - spread[f'{name}_min']
+    tag = '_'.join(part for part in (forest, weighting) if part)
+    spread.to_csv(os.path.join(data_dir, f'LST_resolution_comparison_{tag}_seasonal_range.csv'))
+    return comparison
@@ -0,0 +1,199 @@
+"""Bounded on-disk memoisation of pipeline stages.
+
+A stage result is stored under a key made of the stage name, a digest of
+the stage's code and a fingerprint of every argument, defaults included:
+- frames and series are hashed with ``pd.util.hash_pandas_object``;
+- arrays are hashed by their bytes;
+- paths of existing files are hashed by content. A file's digest is
+  remembered per (size, mtime) so it is not re-read.
+The code digest (``source_digest``) covers the module defining the stage
+and every package module it draws on, directly or through other modules,
+so editing the stage or a helper such as ``pair_day_night`` invalidates
+its entries. Re-running a figure script with the same code, inputs and
+parameters therefore loads the stage outputs instead of recomputing them. The store keeps to a
+byte budget by evicting the least recently used entries; a hit refreshes
+an entry's mtime.
+
+Only stages that cost far more than hashing their inputs are memoised:
+``paired_daily_lst``, ``grouped_bootstrap_ci`` and ``harvest_fraction_sum``.
+A grouped pass such as ``grouped_moments`` is cheaper to recompute.
+
+``FOREST_HARVEST_MEMO=0`` turns memoisation off. ``FOREST_HARVEST_MEMO_MB``
+sets the budget (default 1024 MB).
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import numpy as np
+import pandas as pd
+
+from .cache import _write_atomic, file_digest
+from .paths import CACHE_DIR
+
+MEMO_ENV = "FOREST_HARVEST_MEMO"
+BUDGET_ENV = "FOREST_HARVEST_MEMO_MB"
+
+
+def enabled():
+    return os.environ.get(MEMO_ENV, "1") != "0"
+
+
+class StageCache:
+    """Pickled stage results under ``root``, at most ``max_bytes`` in total."""
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._digests = None
+
+    def _file_digest(self, path):
+        st = os.stat(path)
+        index_path = self.root / "digests.json"
+        if self._digests is None:
+            self._digests = json.loads(index_path.read_text()) if index_path.exists() else {}
+        name = str(Path(path).resolve())
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self._digests.get(name)
+        if entry is None or entry[:2] != stamp:
+            entry = stamp + [file_digest(path)]
+            self._digests[name] = entry
+            self.root.mkdir(parents=True, exist_ok=True)
+            _write_atomic(index_path, lambda p: p.write_text(json.dumps(self._digests)))
+        return entry[2]
+
+    def fingerprint(self, obj, h=None):
+        """Feed a stable description of ``obj`` into ``h`` (a new sha256 if None); returns ``h``."""
+        h = hashlib.sha256() if h is None else h
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(b"frame")
+            layout = obj.dtypes.items() if isinstance(obj, pd.DataFrame) else [(obj.name, obj.dtype)]
+            h.update(repr([(name, str(dtype)) for name, dtype in layout]).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        elif isinstance(obj, np.ndarray):
+            h.update(f"array{obj.dtype}{obj.shape}".encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+        elif isinstance(obj, (str, os.PathLike)) and os.path.isfile(obj):
+            h.update(b"file")
+            h.update(self._file_digest(obj).encode())
+        elif isinstance(obj, (list, tuple)):
+            h.update(f"{type(obj).__name__}{len(obj)}".encode())
+            for item in obj:
+                self.fingerprint(item, h)
+        elif isinstance(obj, dict):
+            h.update(f"dict{len(obj)}".encode())
+            for k in sorted(obj, key=repr):
+                self.fingerprint(k, h)
+                self.fingerprint(obj[k], h)
+        else:
+            h.update(repr(obj).encode())
+        return h
+
+    def get(self, stage, parts, build):
+        """Return ``build()``, memoised under ``stage`` and the fingerprint of ``parts``."""
+        key = self.fingerprint((stage, parts)).hexdigest()
+        path = self.root / stage / f"{key}.pkl"
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                os.utime(path)
+                return value
+            except (OSError, EOFError, pickle.UnpicklingError):
+                path.unlink(missing_ok=True)
+
+        value = build()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        _write_atomic(path, write)
+        self.evict()
+        return value
+
+    def entries(self):
+        """(mtime, size, path) of every stored result, oldest first."""
+        out = []
+        for path in self.root.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            out.append((st.st_mtime_ns, st.st_size, path))
+        return sorted(out)
+
+    def evict(self):
+        """Delete least recently used results until the store fits the budget."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def default_cache():
+    budget = int(os.environ.get(BUDGET_ENV, 1024))
+    return StageCache(CACHE_DIR / "memo", budget * 2**20)
+
+
+@functools.lru_cache(maxsize=None)
+def source_digest(func):
+    """SHA-256 of the source files of ``func``'s module and of the package modules it reaches.
+
+    A module reaches the package modules it imports, directly or through
+    the functions and classes it imports from them.
+    """
+    package = func.__module__.split(".")[0]
+    digests = {}
+    pending = [func.__module__]
+    while pending:
+        name = pending.pop()
+        if name in digests or name not in sys.modules:
+            continue
+        module = sys.modules[name]
+        digests[name] = file_digest(module.__file__)
+        for value in vars(module).values():
+            used = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+            if isinstance(used, str) and used.startswith(package + "."):
+                pending.append(used)
+    return hashlib.sha256(json.dumps(sorted(digests.items())).encode()).hexdigest()
+
+
+def memoised(stage, version="1"):
+    """Decorator: memoise a function on its code and the fingerprint of all its arguments.
+
+    Arguments are bound to the signature with the defaults filled in, so
+    passing a default explicitly hits the same entry. Edits to the package
+    code invalidate entries by themselves (``source_digest``); bump
+    ``version`` only when the output changes for another reason, such as a
+    new library release.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            parts = (version, source_digest(func), dict(bound.arguments))
+            return default_cache().get(stage, parts, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorate
@@ -0,0 +1,54 @@
+"""One-to-one pairing of day and night LST records.
+
+Every export row is one (lossYear, analysisYear, region, season, forest)
+observation, so the day and night files are aligned on that full key with a
+hash join. Joining on a partial key such as (season, effectYear, region)
+matches every loss/analysis year pair with the same difference against each
+other and grows quadratically with the record length.
+"""
+
+import warnings
+
+import pandas as pd
+
+from .trace import traced
+
+# Natural key of one record in the LST exports
+PAIR_KEYS = ["lossYear", "analysisYear", "region", "season", "forest"]
+
+
+def duplicate_keys(df, keys=PAIR_KEYS):
+    """Return the rows of ``df`` whose key occurs more than once."""
+    return df[df.duplicated(keys, keep=False)]
+
+
+@traced("pairing")
+def pair_day_night(day, night, keys=PAIR_KEYS, how="inner"):
+    """Align day and night records on ``keys``, one output row per observation.
+
+    Columns other than the keys that exist on both sides (e.g. ``effectYear``)
+    are derived from the key and taken from ``day``. Duplicate keys make the
+    pairing ambiguous and raise ``ValueError``; records found on one side only
+    are reported with a warning and dropped unless ``how="outer"``.
+    """
+    keys = list(keys)
+    for name, df in (("day", day), ("night", night)):
+        dups = duplicate_keys(df, keys)
+        if len(dups):
+            examples = dups[keys].drop_duplicates().head().to_string(index=False)
+            raise ValueError(f"{len(dups)} {name} records share a key:\n{examples}")
+
+    shared = [c for c in night.columns if c in day.columns and c not in keys]
+    merged = pd.merge(day, night.drop(columns=shared), on=keys, how="outer", indicator=True)
+
+    unmatched = merged["_merge"] != "both"
+    if unmatched.any():
+        counts = merged.loc[unmatched, "_merge"].value_counts()
+        examples = merged.loc[unmatched, keys].head().to_string(index=False)
+        warnings.warn(
+            f"{counts.get('left_only', 0)} day and {counts.get('right_only', 0)} night "
+            f"records have no counterpart:\n{examples}", stacklevel=2)
+        if how == "inner":
+            merged = merged[~unmatched]
+
+    return merged.drop(columns="_merge").reset_index(drop=True)
@@ -0,0 +1,61 @@
+"""Default locations of the input data, caches and generated graphs."""
+
+import os
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+
+DATA_DIR = Path(os.environ.get("FOREST_HARVEST_DATA", REPO_DIR / "data"))
+LST_DIR = DATA_DIR / "LST_Diff"
+# Exports restricted to an elevation difference of at most 100 m (suffix "elev_diff100")
+ELEV_SUFFIX = "elev_diff100"
+ELEV_DIR = DATA_DIR / ELEV_SUFFIX
+LST_DIRS = (LST_DIR, ELEV_DIR)
+GRAPH_DIR = Path(os.environ.get("FOREST_HARVEST_GRAPH", REPO_DIR / "graph"))
+
+# Parsed copies of the CSV exports live here; safe to delete at any time
+CACHE_DIR = Path(os.environ.get("FOREST_HARVEST_CACHE", DATA_DIR / ".cache"))
+
+
+def _check_unloaded(what):
+    # Modules bind the paths (often as default arguments) when they are imported
+    loaded = [name for name in sys.modules
+              if name.startswith(__package__ + ".") and name.rsplit(".", 1)[1] not in ("paths", "cli", "__main__")]
+    if loaded:
+        raise RuntimeError(f"Set the {what} directory before importing {', '.join(sorted(loaded))}")
+
+
+def use_data_dir(path):
+    """Make ``path`` the data directory of this process and of the processes it starts.
+
+    The LST directories follow it, and so does the cache directory unless
+    ``FOREST_HARVEST_CACHE`` is set. Like ``use_graph_dir`` and
+    ``use_cache_dir``, this must run before any other module of the
+    package is imported.
+    """
+    global DATA_DIR, LST_DIR, ELEV_DIR, LST_DIRS, CACHE_DIR
+    _check_unloaded("data")
+    DATA_DIR = Path(path)
+    LST_DIR = DATA_DIR / "LST_Diff"
+    ELEV_DIR = DATA_DIR / ELEV_SUFFIX
+    LST_DIRS = (LST_DIR, ELEV_DIR)
+    if "FOREST_HARVEST_CACHE" not in os.environ:
+        CACHE_DIR = DATA_DIR / ".cache"
+    os.environ["FOREST_HARVEST_DATA"] = str(DATA_DIR)
+
+
+def use_graph_dir(path):
+    """Make ``path`` the graph directory of this process and of the processes it starts."""
+    global GRAPH_DIR
+    _check_unloaded("graph")
+    GRAPH_DIR = Path(path)
+    os.environ["FOREST_HARVEST_GRAPH"] = str(GRAPH_DIR)
+
+
+def use_cache_dir(path):
+    """Make ``path`` the cache directory of this process and of the processes it starts."""
+    global CACHE_DIR
+    _check_unloaded("cache")
+    CACHE_DIR = Path(path)
+    os.environ["FOREST_HARVEST_CACHE"] = str(CACHE_DIR)
@@ -0,0 +1,113 @@
+"""Mergeable histogram sketches built from the exported LST percentiles.
+
+Every LST record carries its pixel count and the ``p5`` ... ``p95``
+percentiles of its pixels. ``grouped_sketch`` turns each record into a
+piecewise-linear CDF through those percentiles. The CDF is extended
+linearly to probability 0 and 1 with the slope of the outermost segments.
+The record's pixel count is then spread over the bins of one value grid
+shared by all records. A sketch is a ``(groups, bins)`` array of pixel
+counts, so merging cohorts, regions or seasons is a sum. Pooled quantiles
+come from the merged cumulative counts, accurate to about one bin width.
+"""
+
+import numpy as np
+
+from .trace import traced
+
+# Exported percentile columns and their probabilities
+QUANTILE_COLUMNS = {"p5": 0.05, "p10": 0.10, "p25": 0.25, "p50": 0.50, "p75": 0.75, "p90": 0.90, "p95": 0.95}
+
+
+def _knots(quantiles, probs):
+    """Append probability 0 and 1 knots by extending the outermost segments."""
+    q = np.maximum.accumulate(np.asarray(quantiles, dtype=np.float64), axis=1)
+    p = np.asarray(probs, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        low_slope = np.nan_to_num((q[:, 1] - q[:, 0]) / (p[1] - p[0]))
+        high_slope = np.nan_to_num((q[:, -1] - q[:, -2]) / (p[-1] - p[-2]))
+    q0 = q[:, 0] - low_slope * p[0]
+    q1 = q[:, -1] + high_slope * (1 - p[-1])
+    return np.column_stack([q0, q, q1]), np.concatenate([[0], p, [1]])
+
+
+def value_grid(quantiles, probs, bins=400):
+    """Bin edges spanning the extended range of all records (NaN rows ignored)."""
+    q, _ = _knots(quantiles, probs)
+    return np.linspace(np.nanmin(q[:, 0]), np.nanmax(q[:, -1]), bins + 1)
+
+
+def record_cdf(quantiles, probs, edges):
+    """CDF of every record at ``edges`` as an ``(records, edges)`` array."""
+    q, p = _knots(quantiles, probs)
+    lo, hi = q[:, :-1, None], q[:, 1:, None]
+    width = hi - lo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.clip((edges - lo) / width, 0, 1)
+    # Zero-width segments are steps
+    frac = np.where(width > 0, frac, edges >= lo)
+    return np.einsum("k,rke->re", np.diff(p), frac)
+
+
+class QuantileSketch:
+    """Pixel counts of several groups on one shared value grid."""
+
+    def __init__(self, edges, counts):
+        self.edges = np.asarray(edges)
+        self.counts = np.asarray(counts)
+
+    def __add__(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Sketches on different value grids cannot be merged")
+        return QuantileSketch(self.edges, self.counts + other.counts)
+
+    @property
+    def total(self):
+        return self.counts.sum(axis=1)
+
+    def regroup(self, codes, ngroups):
+        """Merge groups: group ``i`` is added into output group ``codes[i]`` (-1 drops it)."""
+        codes = np.asarray(codes)
+        counts = np.zeros((ngroups, self.counts.shape[1]))
+        keep = codes >= 0
+        np.add.at(counts, codes[keep], self.counts[keep])
+        return QuantileSketch(self.edges, counts)
+
+    def quantile(self, probs):
+        """Quantiles of every group as a ``(groups, len(probs))`` array (NaN for empty groups)."""
+        probs = np.atleast_1d(probs)
+        cum = np.concatenate([np.zeros((len(self.counts), 1)), np.cumsum(self.counts, axis=1)], axis=1)
+        total = cum[:, -1:]
+        out = np.empty((len(cum), len(probs)))
+        for i, prob in enumerate(probs):
+            target = prob * total
+            # Last edge whose cumulative count is below the target, then interpolate in its bin
+            j = np.clip((cum < target).sum(axis=1) - 1, 0, len(self.edges) - 2)
+            lo = np.take_along_axis(cum, j[:, None], axis=1)
+            hi = np.take_along_axis(cum, j[:, None] + 1, axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                frac = np.clip(np.where(hi > lo, (target - lo) / (hi - lo), 0), 0, 1)[:, 0]
+            out[:, i] = self.edges[j] + frac * (self.edges[j + 1] - self.edges[j])
+        out[total[:, 0] <= 0] = np.nan
+        return out
+
+
+@traced("sketch")
+def grouped_sketch(quantiles, probs, counts, codes, ngroups, edges, chunk_rows=1024):
+    """Merge the records' sketches per group.
+
+    ``quantiles`` is ``(records, len(probs))``, ``counts`` the pixels of every
+    record and ``codes`` its group (-1, NaN quantiles or NaN counts skip the
+    record). Records are processed ``chunk_rows`` at a time, so the
+    per-record CDFs are never all in memory.
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    codes = np.asarray(codes)
+    rows = np.flatnonzero((codes >= 0) & np.isfinite(counts) & np.isfinite(quantiles).all(axis=1))
+
+    out = np.zeros((ngroups, len(edges) - 1))
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        mass = np.diff(record_cdf(quantiles[chunk], probs, edges), axis=1) * counts[chunk, None]
+        np.add.at(out, codes[chunk], mass)
+    return QuantileSketch(edges, out)
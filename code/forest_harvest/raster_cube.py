@@ -0,0 +1,246 @@
+"""Memory-mapped, year-indexed copies of the harvest rasters.
+
+A GeoTIFF band stack is converted once into a cube directory holding
+- ``data.npy``: a ``(year, row, col)`` array in ``.npy`` format,
+  memory-mapped on open;
+- ``cube.json``: the ``years`` coordinate, the grid (transform, CRS, nodata)
+  and the size, mtime and SHA-256 of every source file.
+The conversion reads the source in blocks of whole rows within a memory
+budget, as in ``harvest_raster``. ``open_cube`` converts again only when the
+source has changed; ``is_current`` makes the same check for cubes computed
+from several rasters.
+
+Reads come from the page cache, not a GeoTIFF decode. Year ranges
+(``years_between``), spatial windows (``window``) and pixel time series
+(``series``) are numpy views of the memmap; nothing is copied until the
+values are used. The layout is year-major, so a year range or a window is
+one contiguous run of rows per year, and a pixel series is a strided view
+with one element per year.
+
+Band 0 of the loss stack and the single band of the forest raster are
+2000. The ratio raster holds the 2004-2023 total in one band, filed under
+2023::
+
+    python -m forest_harvest.raster_cube ../data/ForestLossRatio_2004_2023_v2.tif --first-year 2023
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import Affine, rowcol
+from rasterio.windows import transform as window_transform
+
+from .cache import _write_atomic, file_digest
+from .harvest_raster import block_rows, row_windows
+from .paths import CACHE_DIR
+from .trace import traced
+
+# Bump when the layout of data.npy or cube.json changes
+CUBE_VERSION = "2"
+
+DATA_FILE = "data.npy"
+META_FILE = "cube.json"
+
+# First year of the band stacks that ship with the figures
+FIRST_YEAR = 2000
+
+
+def default_cube_dir(src_path, cache_dir=CACHE_DIR):
+    """Cube directory of a raster under ``cache_dir``."""
+    return Path(cache_dir) / "cubes" / Path(src_path).stem
+
+
+class RasterCube:
+    """A ``(year, row, col)`` memmap with its year coordinate and grid.
+
+    ``data`` is read-only; every selection below returns a view of it.
+    """
+
+    def __init__(self, cube_dir):
+        self.path = Path(cube_dir)
+        self.meta = json.loads((self.path / META_FILE).read_text())
+        self.data = np.load(self.path / DATA_FILE, mmap_mode="r")
+        self.years = np.asarray(self.meta["years"], dtype=np.int64)
+        self.transform = Affine(*self.meta["transform"])
+        self.crs = self.meta["crs"]
+        self.nodata = self.meta["nodata"]
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def _year_index(self, year):
+        i = int(np.searchsorted(self.years, year))
+        if i == len(self.years) or self.years[i] != year:
+            raise KeyError(f"No band for year {year} in {self.path} ({self.years[0]}-{self.years[-1]})")
+        return i
+
+    def year(self, year):
+        """The ``(row, col)`` band of one year."""
+        return self.data[self._year_index(year)]
+
+    def years_between(self, start, end):
+        """Bands of the years ``start`` to ``end`` (inclusive) and their years.
+
+        Replaces positional band slices such as ``band=slice(3, 23)`` for
+        2003-2022 of the loss stack.
+        """
+        i, j = np.searchsorted(self.years, [start, end + 1])
+        return self.data[i:j], self.years[i:j]
+
+    def series(self, row, col):
+        """Time series of one pixel, one value per year."""
+        return self.data[:, row, col]
+
+    def series_at(self, x, y):
+        """Time series of the pixel containing the point ``(x, y)`` in the cube's CRS."""
+        row, col = rowcol(self.transform, x, y)
+        if not (0 <= row < self.shape[1] and 0 <= col < self.shape[2]):
+            raise IndexError(f"({x}, {y}) is outside {self.path}")
+        return self.series(row, col)
+
+    def window(self, window, years=None):
+        """Bands inside a rasterio ``Window`` (of the years ``(start, end)`` if given).
+
+        Returns the view and the transform of its top-left pixel.
+        """
+        window = window.round_offsets().round_lengths()
+        rows, cols = window.toslices()
+        bands = self.data if years is None else self.years_between(*years)[0]
+        return bands[:, rows, cols], window_transform(window, self.transform)
+
+    def profile(self, count=1, dtype="float32"):
+        """GeoTIFF profile of the cube's grid, e.g. for writing per-pixel results."""
+        return {"driver": "GTiff", "height": self.shape[1], "width": self.shape[2], "count": count,
+                "dtype": dtype, "crs": self.crs, "transform": self.transform, "nodata": self.nodata,
+                "tiled": True, "blockxsize": 256, "blockysize": 256, "compress": "deflate"}
+
+
+def _source_stamp(src_path):
+    st = os.stat(src_path)
+    return {"source": str(Path(src_path).resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _paths(sources):
+    return [sources] if isinstance(sources, (str, os.PathLike)) else list(sources)
+
+
+def is_current(cube_dir, sources, years=None):
+    """True if the cube in ``cube_dir`` was built from the present contents of ``sources``.
+
+    ``sources`` is a path or a list of paths, in the order given to
+    ``write_cube``. With ``years`` the cube must also have that year
+    coordinate. A source with a new mtime but the same content only has
+    its stamp refreshed.
+    """
+    meta_path = Path(cube_dir) / META_FILE
+    if not (meta_path.exists() and (Path(cube_dir) / DATA_FILE).exists()):
+        return False
+    meta = json.loads(meta_path.read_text())
+    if meta.get("version") != CUBE_VERSION:
+        return False
+    if years is not None and meta["years"] != [int(year) for year in years]:
+        return False
+    recorded = meta.get("sources", [])
+    if [entry["source"] for entry in recorded] != [str(Path(path).resolve()) for path in _paths(sources)]:
+        return False
+
+    refreshed = False
+    for entry in recorded:
+        stamp = _source_stamp(entry["source"])
+        if entry["size"] != stamp["size"]:
+            return False
+        if entry["mtime_ns"] != stamp["mtime_ns"]:
+            if entry["sha256"] != file_digest(entry["source"]):
+                return False
+            entry["mtime_ns"] = stamp["mtime_ns"]
+            refreshed = True
+    if refreshed:
+        _write_atomic(meta_path, lambda p: p.write_text(json.dumps(meta)))
+    return True
+
+
+def write_cube(cube_dir, blocks, years, height, width, transform, crs, nodata=None, dtype="float32", sources=()):
+    """Write a cube from ``(window, array)`` blocks of whole-width rows.
+
+    Each ``array`` holds the ``(year, row, col)`` values of its window.
+    ``sources`` (a path or a list of paths) are stamped for ``is_current``. The
+    data is written to a temporary file and moved into place before the
+    metadata, so an interrupted write leaves no cube behind.
+    """
+    cube_dir = Path(cube_dir)
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    (cube_dir / META_FILE).unlink(missing_ok=True)
+
+    tmp = cube_dir / (DATA_FILE + ".tmp")
+    data = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=(len(years), height, width))
+    for window, block in blocks:
+        data[:, window.row_off:window.row_off + window.height] = block
+    data.flush()
+    del data
+    os.replace(tmp, cube_dir / DATA_FILE)
+
+    meta = {
+        "version": CUBE_VERSION,
+        "years": [int(year) for year in years],
+        "transform": list(transform)[:6],
+        "crs": None if crs is None else str(crs),
+        "nodata": nodata,
+        "sources": [dict(_source_stamp(path), sha256=file_digest(path)) for path in _paths(sources)],
+    }
+    _write_atomic(cube_dir / META_FILE, lambda p: p.write_text(json.dumps(meta)))
+    return cube_dir
+
+
+@traced("cube_convert")
+def convert(src_path, cube_dir=None, years=None, first_year=FIRST_YEAR, memory_budget_mb=256):
+    """Convert a GeoTIFF band stack into a cube; returns the cube directory.
+
+    Band ``i`` is the year ``years[i]``, by default ``first_year + i``.
+    Values keep the raster's dtype.
+    """
+    cube_dir = default_cube_dir(src_path) if cube_dir is None else cube_dir
+    with rasterio.open(src_path) as src:
+        years = list(range(first_year, first_year + src.count)) if years is None else list(years)
+        if len(years) != src.count or np.any(np.diff(years) <= 0):
+            raise ValueError(f"{src_path} has {src.count} bands; need as many increasing years, got {years}")
+
+        rows = min(src.height, block_rows(src.count, src.width, memory_budget_mb))
+        blocks = ((window, src.read(window=window)) for window in row_windows(src.height, src.width, rows))
+        return write_cube(cube_dir, blocks, years, src.height, src.width, src.transform, src.crs,
+                          nodata=src.nodata, dtype=src.dtypes[0], sources=src_path)
+
+
+def open_cube(src_path, cube_dir=None, years=None, first_year=FIRST_YEAR, memory_budget_mb=256):
+    """The cube of a GeoTIFF, converted first if it is missing or the GeoTIFF has changed."""
+    cube_dir = default_cube_dir(src_path) if cube_dir is None else cube_dir
+    if years is None:
+        with rasterio.open(src_path) as src:
+            years = range(first_year, first_year + src.count)
+    if not is_current(cube_dir, src_path, years):
+        convert(src_path, cube_dir, years, first_year, memory_budget_mb)
+    return RasterCube(cube_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert GeoTIFF band stacks into memory-mapped year cubes")
+    parser.add_argument("rasters", nargs="+")
+    parser.add_argument("--out", help="cube directory (one raster only; default: CACHE_DIR/cubes/NAME)")
+    parser.add_argument("--first-year", type=int, default=FIRST_YEAR, help="year of band 1")
+    parser.add_argument("--memory-budget-mb", type=int, default=256)
+    args = parser.parse_args(argv)
+    if args.out and len(args.rasters) > 1:
+        parser.error("--out takes a single raster")
+
+    for path in args.rasters:
+        cube = open_cube(path, args.out, first_year=args.first_year, memory_budget_mb=args.memory_budget_mb)
+        print(f"{path} -> {cube.path} ({cube.shape[0]} years {cube.years[0]}-{cube.years[-1]}, "
+              f"{cube.shape[1]} x {cube.shape[2]} pixels)")
+
+
+if __name__ == "__main__":
+    main()
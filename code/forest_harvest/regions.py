@@ -0,0 +1,93 @@
+"""Country-to-region membership keyed by the GEE (FIPS) country codes.
+
+A grouping is stored as COO pairs ``(region, country)``. ``membership``
+turns them into a ``region x country`` 0/1 matrix for the countries of a
+cube. ``aggregate`` sums every year, loss variant and forest type of all
+regions in one ``tensordot``. Groupings may overlap (a country can sit in
+several groups, as with EU-27 next to the geographic subregions) and
+combining them costs nothing extra: they are more rows of the same matrix.
+"""
+
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from .harvest_cube import HarvestCube
+
+# Countries with harvest exports
+COUNTRY_NAMES = {
+    "AU": "Austria", "BE": "Belgium", "BU": "Bulgaria", "DA": "Denmark", "EI": "Ireland",
+    "EN": "Estonia", "EZ": "Czechia", "FI": "Finland", "FR": "France", "GM": "Germany",
+    "GR": "Greece", "HR": "Croatia", "HU": "Hungary", "IT": "Italy", "LG": "Latvia",
+    "LH": "Lithuania", "LO": "Slovakia", "LU": "Luxembourg", "NL": "Netherlands", "PL": "Poland",
+    "PO": "Portugal", "RO": "Romania", "SI": "Slovenia", "SP": "Spain", "SW": "Sweden",
+    "UK": "United Kingdom",
+}
+
+# UN geoscheme subregions as used in the figures. Countries without exports
+# (Norway, Switzerland, the western Balkans, ...) are listed for completeness.
+SUBREGIONS = {
+    "Northern": ["DA", "SW", "NO", "FI", "IC", "EN", "LG", "LH"],
+    "Western": ["FR", "GM", "BE", "NL", "LU", "SZ", "AU", "MN", "UK", "EI"],
+    "Southern": ["IT", "SP", "PO", "GR", "MT", "CY", "SI", "RI", "HR", "BU", "AL", "MK", "KV", "MJ", "BK"],
+    "Eastern": ["PL", "EZ", "LO", "HU", "RO"],
+}
+
+EU27 = {
+    "EU27": ["AU", "BE", "BU", "HR", "CY", "EZ", "DA", "EN", "FI", "FR", "GM", "GR", "HU", "EI",
+             "IT", "LG", "LH", "LU", "MT", "NL", "PL", "PO", "RO", "LO", "SI", "SP", "SW"],
+}
+
+Grouping = namedtuple("Grouping", "regions region_idx countries")
+
+
+def grouping(*groups):
+    """Merge ``{region: [country codes]}`` dicts into one COO ``Grouping``.
+
+    Region names must be unique across the dicts; the country lists may
+    overlap.
+    """
+    regions, region_idx, countries = [], [], []
+    for group in groups:
+        for region, codes in group.items():
+            if region in regions:
+                raise ValueError(f"Region {region!r} defined twice")
+            region_idx.extend([len(regions)] * len(codes))
+            countries.extend(codes)
+            regions.append(region)
+    return Grouping(regions, np.array(region_idx, dtype=np.intp), np.array(countries))
+
+
+def membership(grouping, countries):
+    """Dense ``region x country`` 0/1 matrix of ``grouping`` over ``countries``."""
+    countries = list(countries)
+    col = {c: i for i, c in enumerate(countries)}
+    matrix = np.zeros((len(grouping.regions), len(countries)))
+    for r, c in zip(grouping.region_idx, grouping.countries):
+        if c in col:
+            matrix[r, col[c]] = 1
+    return matrix
+
+
+def unmapped(grouping, countries):
+    """Countries that belong to no region of ``grouping``."""
+    mapped = set(grouping.countries)
+    return [c for c in countries if c not in mapped]
+
+
+def aggregate(cube, groups=(SUBREGIONS,)):
+    """Sum a ``HarvestCube`` over the countries of each region.
+
+    Returns a ``HarvestCube`` whose country axis holds the region names.
+    Missing exports count as zero, like a ``groupby().sum()``. Countries in
+    the cube that fall in no region are reported with a warning.
+    """
+    regions = groups if isinstance(groups, Grouping) else grouping(*groups)
+    missing = unmapped(regions, cube.countries)
+    if missing:
+        warnings.warn(f"Countries in no region: {missing}", stacklevel=2)
+
+    matrix = membership(regions, cube.countries)
+    values = np.tensordot(matrix, np.nan_to_num(cube.values), axes=(1, 0))
+    return HarvestCube(values, regions.regions, cube.years, cube.variants, cube.forests)
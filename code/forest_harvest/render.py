@@ -0,0 +1,76 @@
+"""Headless figure rendering.
+
+With ``FOREST_HARVEST_HEADLESS=1`` set (or after ``use_headless()``),
+matplotlib uses the Agg/PDF backend, ``plt.show`` is never called and every
+figure is closed as soon as it is saved, so long region loops do not pile up
+open figures. Independent figures can be drawn on a process pool with
+``render_figures``.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from . import trace
+
+HEADLESS_ENV = "FOREST_HARVEST_HEADLESS"
+
+
+def headless():
+    """True when figures should be saved without being shown."""
+    return os.environ.get(HEADLESS_ENV, "") not in ("", "0")
+
+
+def use_headless():
+    """Switch this process (and workers started from it) to the Agg backend."""
+    os.environ[HEADLESS_ENV] = "1"
+    os.environ["MPLBACKEND"] = "Agg"
+    matplotlib.use("Agg", force=True)
+
+
+if headless():
+    use_headless()
+
+
+def finish(fig, path, show=None, **savefig_kw):
+    """Save ``fig`` to ``path``, then show it or close it.
+
+    ``show`` defaults to interactive display unless running headless.
+    """
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with trace.stage("savefig"):
+        fig.savefig(path, **savefig_kw)
+    if show is None:
+        show = not headless()
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def _render_job(draw, path, args, savefig_kw):
+    fig = draw(*args)
+    finish(fig, path, show=False, **savefig_kw)
+    return path
+
+
+def render_figures(draw, jobs, show=None, workers=None, **savefig_kw):
+    """Draw and save independent figures.
+
+    ``jobs`` is a list of ``(path, args)``; ``draw(*args)`` must return a
+    figure and, for parallel use, be a module-level function. Interactive runs
+    draw one figure after another; headless runs use ``workers`` processes
+    (all cores by default, ``1`` to stay in this process).
+    """
+    if show is None:
+        show = not headless()
+    if show or workers == 1 or len(jobs) < 2:
+        for path, args in jobs:
+            finish(draw(*args), path, show=show, **savefig_kw)
+        return [path for path, _ in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+        futures = [pool.submit(_render_job, draw, path, args, savefig_kw) for path, args in jobs]
+        return [f.result() for f in futures]
@@ -0,0 +1,111 @@
+"""Nearest-neighbour reprojection through a cached pixel index.
+
+Warping a raster means working out, for every target pixel, which source
+pixel it falls in. That mapping depends only on the two grids, so it is
+computed once per (source grid, target CRS, resolution), stored under
+``CACHE_DIR/reproject`` and then applied to any number of bands or rasters
+on the same source grid by plain array indexing.
+"""
+
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.transform import Affine, array_bounds
+from rasterio.warp import calculate_default_transform, transform as transform_coords
+
+from .paths import CACHE_DIR
+from .trace import traced
+
+# ETRS89 / LAEA Europe (EPSG:3035)
+LAEA = "+proj=laea +lat_0=52 +lon_0=10 +x_0=4321000 +y_0=3210000 +ellps=GRS80 +units=m +no_defs"
+
+ReprojectionIndex = namedtuple("ReprojectionIndex", "rows cols dst_transform dst_crs dst_shape")
+
+
+def _grid_key(src_crs, src_transform, src_shape, dst_crs, resolution):
+    parts = [
+        CRS.from_user_input(src_crs).to_wkt(),
+        repr(tuple(src_transform)[:6]),
+        repr(tuple(src_shape)),
+        CRS.from_user_input(dst_crs).to_wkt(),
+        repr(resolution),
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def build_index(src_crs, src_transform, src_shape, dst_crs=LAEA, resolution=None, chunk_rows=256):
+    """Compute the source pixel of every target pixel centre (-1 outside the source)."""
+    height, width = src_shape
+    dst_transform, dst_width, dst_height = calculate_default_transform(
+        src_crs, dst_crs, width, height, *array_bounds(height, width, src_transform), resolution=resolution)
+
+    rows = np.full((dst_height, dst_width), -1, dtype=np.int32)
+    cols = np.full((dst_height, dst_width), -1, dtype=np.int32)
+    inverse = ~src_transform
+    col_centres = np.arange(dst_width) + 0.5
+
+    # Transform target pixel centres in row chunks to bound memory
+    for start in range(0, dst_height, chunk_rows):
+        stop = min(start + chunk_rows, dst_height)
+        c, r = np.meshgrid(col_centres, np.arange(start, stop) + 0.5)
+        xs, ys = dst_transform * (c.ravel(), r.ravel())
+        sx, sy = transform_coords(dst_crs, src_crs, xs, ys)
+        src_c, src_r = inverse * (np.asarray(sx), np.asarray(sy))
+        src_c = np.floor(src_c).reshape(c.shape)
+        src_r = np.floor(src_r).reshape(c.shape)
+        inside = (src_r >= 0) & (src_r < height) & (src_c >= 0) & (src_c < width)
+        rows[start:stop][inside] = src_r[inside]
+        cols[start:stop][inside] = src_c[inside]
+
+    return ReprojectionIndex(rows, cols, dst_transform, CRS.from_user_input(dst_crs).to_wkt(),
+                             (dst_height, dst_width))
+
+
+def cached_index(src_crs, src_transform, src_shape, dst_crs=LAEA, resolution=None, cache_dir=CACHE_DIR):
+    """``build_index``, persisted as ``.npz`` and reused for the same pair of grids."""
+    path = os.path.join(cache_dir, "reproject",
+                        _grid_key(src_crs, src_transform, src_shape, dst_crs, resolution) + ".npz")
+    if os.path.exists(path):
+        with np.load(path) as f:
+            return ReprojectionIndex(f["rows"], f["cols"], Affine(*f["dst_transform"]),
+                                     str(f["dst_crs"]), tuple(f["rows"].shape))
+
+    index = build_index(src_crs, src_transform, src_shape, dst_crs, resolution)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, rows=index.rows, cols=index.cols,
+             dst_transform=np.array(tuple(index.dst_transform)[:6]), dst_crs=np.array(index.dst_crs))
+    os.replace(tmp, path)
+    return index
+
+
+def apply_index(index, array, fill=np.nan):
+    """Resample ``array`` (``(..., y, x)`` on the source grid) onto the target grid."""
+    array = np.asarray(array)
+    if np.isnan(fill) and not np.issubdtype(array.dtype, np.floating):
+        array = array.astype(np.float32)
+    out = array[..., index.rows, index.cols]
+    out[..., index.rows < 0] = fill
+    return out
+
+
+@traced("reproject")
+def reproject_raster(path, out_path, dst_crs=LAEA, resolution=None, cache_dir=CACHE_DIR):
+    """Reproject every band of a GeoTIFF with the cached index; returns ``out_path``."""
+    with rasterio.open(path) as src:
+        index = cached_index(src.crs, src.transform, src.shape, dst_crs, resolution, cache_dir)
+        data = apply_index(index, src.read())
+        profile = src.profile.copy()
+
+    profile.update(crs=index.dst_crs, transform=index.dst_transform, height=index.dst_shape[0],
+                   width=index.dst_shape[1], dtype=data.dtype.name, nodata=np.nan)
+    profile.pop("blockxsize", None)
+    profile.pop("blockysize", None)
+    profile.pop("tiled", None)
+    with rasterio.open(out_path, "w", **profile) as dst:
+        dst.write(data)
+    return out_path
@@ -0,0 +1,103 @@
+"""Per-pixel robust statistics along the band axis of a raster stack.
+
+``band_stats`` returns the NaN-aware median, the median absolute deviation
+(median of ``|x - median|``), the mean and the standard deviation of every
+pixel of a ``(band, y, x)`` stack. The two medians are selections
+(``np.partition`` of the middle order statistics), not full sorts, and mean
+and std take two more passes. It works in the stack's own floating dtype
+(float32 for integer input) and splits the rows over a thread pool.
+Partitioning releases the GIL, so the threads run in parallel.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BandStats = namedtuple("BandStats", "median mad mean std")
+
+
+def _partition_median(work, group_sizes):
+    """Median along axis 1 of a ``(pixel, band)`` array, NaNs skipped.
+
+    The pixels are ordered by their number of valid values; the first
+    ``group_sizes[0]`` have none, the next ``group_sizes[1]`` one, and so on.
+    ``np.partition`` puts NaNs last, so each group only selects its upper
+    middle value in place; for an even count the lower one is the largest
+    value left of it. The values of ``work`` are permuted within each pixel.
+    """
+    median = np.empty(work.shape[0], dtype=work.dtype)
+    stop = 0
+    for n, size in enumerate(group_sizes):
+        start, stop = stop, stop + size
+        if size == 0:
+            continue
+        if n == 0:
+            median[start:stop] = np.nan
+            continue
+        part = work[start:stop]
+        hi = n // 2
+        part.partition(hi, axis=1)
+        median[start:stop] = part[:, hi]
+        if n % 2 == 0:
+            # Column-wise maxima are much faster than a row-wise max over a few values
+            lower = part[:, 0].copy()
+            for j in range(1, hi):
+                np.maximum(lower, part[:, j], out=lower)
+            median[start:stop] += lower
+            median[start:stop] /= 2
+    return median
+
+
+def _stats_block(block, out, rows):
+    values = block.reshape(block.shape[0], -1)  # band x pixel
+    n_valid = np.count_nonzero(~np.isnan(values), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=0) / n_valid
+        deviation = values - mean
+        np.square(deviation, out=deviation)
+        std = np.sqrt(np.nansum(deviation, axis=0) / n_valid)
+    del deviation
+
+    # Pixel-major copy, ordered by valid count, so each count's pixels are one
+    # contiguous run and each pixel's values are contiguous
+    group_sizes = np.bincount(n_valid, minlength=values.shape[0] + 1)
+    order = None if group_sizes.max() == len(n_valid) else np.argsort(n_valid, kind="stable")
+    work = values.T.copy() if order is None else values.T[order]
+    median = _partition_median(work, group_sizes)
+
+    # Reuse the buffer for the absolute deviations; NaNs stay NaN
+    np.subtract(work, median[:, None], out=work)
+    np.abs(work, out=work)
+    mad = _partition_median(work, group_sizes)
+
+    if order is not None:
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        median, mad = median[inverse], mad[inverse]
+    for target, value in zip(out, (median, mad, mean, std)):
+        target[rows] = value.reshape(block.shape[1:])
+
+
+def band_stats(stack, workers=None, rows_per_task=64):
+    """Return ``BandStats`` (median, mad, mean, std) along axis 0 of ``stack``.
+
+    NaNs are skipped; pixels without any valid value get NaN. The standard
+    deviation uses ``ddof=0`` like ``xarray``'s ``std``. Rows are processed in
+    tasks of ``rows_per_task`` on ``workers`` threads (``1`` runs inline).
+    """
+    stack = np.asarray(stack)
+    if not np.issubdtype(stack.dtype, np.floating):
+        stack = stack.astype(np.float32)
+
+    shape = stack.shape[1:]
+    out = BandStats(*(np.empty(shape, dtype=stack.dtype) for _ in BandStats._fields))
+
+    slices = [slice(r, r + rows_per_task) for r in range(0, shape[0], rows_per_task)]
+    if workers == 1 or len(slices) < 2:
+        for rows in slices:
+            _stats_block(stack[:, rows], out, rows)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda rows: _stats_block(stack[:, rows], out, rows), slices))
+    return out
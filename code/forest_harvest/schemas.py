@@ -0,0 +1,72 @@
+"""Column schemas and readers for the Google Earth Engine CSV exports.
+
+The exports carry a long ``system:index`` string and an always-empty
+``.geo`` GeoJSON column that no figure uses. The readers below parse only the
+columns listed here, with compact dtypes: categorical labels, int16 years,
+float32 LST statistics and float64 areas. The areas are summed over many
+countries, so they keep full precision.
+"""
+
+import numpy as np
+import pandas as pd
+
+SEASONS = ["Spring", "Summer", "Autumn", "Winter", "Annual"]
+SEASON_DTYPE = pd.CategoricalDtype(SEASONS)
+
+# Labels seen in older exports and scripts
+SEASON_ALIASES = {"Fall": "Autumn"}
+
+LST_STATS = ["mean", "p5", "p10", "p25", "p50", "p75", "p90", "p95", "stdDev"]
+
+# MODIS LST scale factor of the older 1 km exports
+LST_SCALE = 0.02
+
+LST_LABELS = ["forest", "region", "season"]
+LST_YEARS = ["lossYear", "analysisYear"]
+
+COUNTRY_COLUMNS = {"Forest Loss Total": np.float64, "year": np.float32}
+
+
+def normalise_season(season):
+    """Map season labels onto ``SEASON_DTYPE`` (``'Fall'`` becomes ``'Autumn'``)."""
+    season = pd.Series(season, copy=False).astype(str).replace(SEASON_ALIASES)
+    return season.astype(SEASON_DTYPE)
+
+
+def lst_prefix(path, variable):
+    """Return the column prefix used by an export (``LST_Day_`` or ``LST_Day_1km_``)."""
+    with open(path) as f:
+        header = f.readline()
+    scaled = f"LST_{variable}_1km_mean" in header
+    return (f"LST_{variable}_1km_" if scaled else f"LST_{variable}_"), scaled
+
+
+def read_lst_csv(path, variable):
+    """Parse one LST export into the harmonised column layout.
+
+    Statistics columns lose their variable prefix (``count``, ``mean``,
+    ``p5`` ... ``p95``, ``stdDev``) and are returned in degrees; the 5 km
+    exports simply have no ``p10``/``p90``.
+    """
+    prefix, scaled = lst_prefix(path, variable)
+    dtypes = {f"{prefix}count": np.int32}
+    dtypes.update({f"{prefix}{s}": np.float32 for s in LST_STATS})
+    dtypes.update({c: "category" for c in LST_LABELS})
+    dtypes.update({c: np.float32 for c in LST_YEARS})
+
+    df = pd.read_csv(path, usecols=lambda c: c in dtypes, dtype=dtypes)
+    df = df.rename(columns=lambda c: c[len(prefix):] if c.startswith(prefix) else c)
+
+    df[LST_YEARS] = df[LST_YEARS].astype(np.int16)
+    df["season"] = normalise_season(df["season"])
+    if scaled:
+        stats = [c for c in LST_STATS if c in df.columns]
+        df[stats] = df[stats] * np.float32(LST_SCALE)
+    return df
+
+
+def read_country_csv(path):
+    """Parse one ``Country_Forest_Change_*`` export (``year``, ``Forest Loss Total``)."""
+    df = pd.read_csv(path, usecols=list(COUNTRY_COLUMNS), dtype=COUNTRY_COLUMNS)
+    df["year"] = df["year"].astype(np.int16)
+    return df
@@ -0,0 +1,331 @@
+"""Synthetic exports with the layout of the Google Earth Engine exports.
+
+Writes test corpora of any size in the shipped formats:
+
+- ``LST_{Day,Night,Daily_Mean}_{patch}_{forest}_{season}.csv`` with the
+  export's column order, ``system:index`` and ``.geo`` strings, and no
+  ``p10``/``p90`` for the 330 cell and 5 km patches;
+- ``DataGEE_*/Country_Forest_Change_{variant}_{country}.csv`` with the
+  areas in Java's number format, as GEE writes them;
+- a 20 km loss stack (one band per year from 2000) and a forest raster for
+  ``harvest_raster.harvest_fraction_sum``.
+
+Values follow the shipped data: pixel counts are log-normal and shrink with
+the effect year, LST differences decay with the effect year, the
+percentiles spread around the mean by the record's ``stdDev``, and the
+``Europe`` region pools the other regions. Everything is written in chunks
+of rows (CSV) or blocks of raster rows, so corpora of many GB never sit in
+memory. A chunk's values depend only on ``seed`` and the chunk's position,
+so a corpus is reproducible. Run from the ``code`` directory::
+
+    python -m forest_harvest.synthetic ../data/synthetic --regions 50 --cohorts 40 --raster-size 4460 3850
+
+and point ``FOREST_HARVEST_DATA`` at the output.
+"""
+
+import argparse
+import itertools
+import os
+import string
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .regions import COUNTRY_NAMES
+from .schemas import SEASONS
+
+GEO = '{"type":"MultiPoint","coordinates":[]}'
+_GEO_FIELD = '"' + GEO.replace('"', '""') + '"'
+
+# Regions of the shipped exports; "Europe" pools all the others
+REGIONS = ["Europe", "WesternEurope", "NorthernEurope", "SouthernEurope", "EasternEurope"]
+
+# Percentiles exported per patch
+PERCENTILES = {"p5": -1.645, "p10": -1.2816, "p25": -0.6745, "p50": 0.0, "p75": 0.6745, "p90": 1.2816, "p95": 1.645}
+COARSE_PERCENTILES = ["p5", "p25", "p50", "p75", "p95"]
+
+# Median pixel count of a sub-region record in effect year 1
+PATCH_COUNTS = {"220cell": 800, "330cell": 700, "5km": 40}
+
+# LST change (K) in effect year 1, its decay (years), record noise and pixel spread
+VARIABLE_PARAMS = {
+    "Day": dict(effect=0.10, decay=8.0, noise=0.05, spread=0.73),
+    "Night": dict(effect=-0.04, decay=8.0, noise=0.10, spread=0.80),
+}
+SEASON_FACTORS = {"Spring": 1.0, "Summer": 1.6, "Autumn": 0.8, "Winter": 0.3, "Annual": 1.0}
+
+# Directory -> loss variants, as shipped, and each variant's share of the total loss
+COUNTRY_LAYOUT = {
+    "DataGEE_FIRE_MED": ["TOTAL_loss", "loss", "loss_WIND"],
+    "DataGEE_FIRE_TOT": ["Compact_loss_WIND", "TOTAL_loss_WIND", "loss_WIND_", "loss_WIND_ICL"],
+    "DataGEE_FIRE_FORESTS": ["Compact_loss_broad_WIND", "Compact_loss_Needle_WIND", "Compact_loss_Mix_WIND"],
+}
+VARIANT_SHARES = {
+    "TOTAL_loss": 1.0, "TOTAL_loss_WIND": 1.1, "loss": 0.8, "loss_WIND": 0.9, "loss_WIND_": 0.9,
+    "loss_WIND_ICL": 0.85, "Compact_loss_WIND": 0.6, "Compact_loss_broad_WIND": 0.2,
+    "Compact_loss_Needle_WIND": 0.3, "Compact_loss_Mix_WIND": 0.1,
+}
+
+# 20 km grid over the extent of ForestLossRatio_2004_2023_v2.tif
+GRID_ORIGIN = (-10.034181723615056, 70.54469926190603)
+GRID_STEP = 20 * 0.008983152841195215
+GRID_SIZE = (223, 193)
+
+# Forest area of a fully forested 20 km pixel, as in harvest_raster
+FULL_FOREST = 640000
+
+
+def _rng(seed, *key):
+    """Generator for one chunk, keyed on ``seed`` and the chunk's labels."""
+    words = [zlib.crc32(str(k).encode()) for k in key]
+    return np.random.default_rng([seed, *words])
+
+
+def region_names(regions):
+    """``regions`` names: the shipped ones first, then ``Region5``, ``Region6``, ..."""
+    if not isinstance(regions, int):
+        return list(regions)
+    return (REGIONS + [f"Region{i}" for i in range(len(REGIONS), regions)])[:regions]
+
+
+def country_codes(countries):
+    """``countries`` two-letter codes: the shipped ones first, then unused letter pairs."""
+    if not isinstance(countries, int):
+        return list(countries)
+    shipped = list(COUNTRY_NAMES)
+    spare = ("".join(p) for p in itertools.product(string.ascii_uppercase, repeat=2))
+    spare = (code for code in spare if code not in COUNTRY_NAMES)
+    return list(itertools.islice(itertools.chain(shipped, spare), countries))
+
+
+def java_double(x):
+    """Format a float as Java's ``Double.toString`` (scientific outside [1e-3, 1e7))."""
+    if x == 0 or 1e-3 <= abs(x) < 1e7 or not np.isfinite(x):
+        return repr(float(x))
+    mantissa, exponent = np.format_float_scientific(x, unique=True, trim="0").split("e")
+    return f"{mantissa}E{int(exponent)}"
+
+
+def _index_patch(patch):
+    return f"{patch}s" if patch.endswith("cell") else patch
+
+
+def lst_columns(variable, patch):
+    """Columns of an LST export in the order GEE writes them."""
+    percentiles = list(PERCENTILES) if patch == "220cell" else COARSE_PERCENTILES
+    stats = sorted(["count", "mean", "stdDev", *percentiles])
+    return (["system:index"] + [f"LST_{variable}_{s}" for s in stats]
+            + ["analysisYear", "forest", "lossYear", "region", "season", ".geo"])
+
+
+def _cohort_keys(first_loss_year, cohorts):
+    """(lossYear, analysisYear) of every record: each cohort up to the year after the last one."""
+    last = first_loss_year + cohorts
+    return [(loss, year) for loss in range(first_loss_year, last) for year in range(loss + 1, last + 1)]
+
+
+def _variable_stats(rng, params, season, effect_year, base_count, percentiles):
+    """Pixel count, mean, stdDev and percentiles of one variable for every record."""
+    n = len(effect_year)
+    count = np.maximum(1, np.rint(base_count * rng.uniform(0.85, 1.0, n))).astype(np.int64)
+    signal = params["effect"] * SEASON_FACTORS[season] * np.exp(-(effect_year - 1) / params["decay"])
+    mean = signal + params["noise"] * rng.standard_normal(n)
+    sd = params["spread"] * rng.lognormal(0, 0.2, n)
+    median = mean - 0.08 * sd + 0.02 * rng.standard_normal(n)
+    z = np.array([PERCENTILES[p] for p in percentiles])
+    q = median[:, None] + sd[:, None] * z * rng.lognormal(0, 0.1, (n, len(z)))
+    return count, mean, sd, np.sort(q, axis=1)
+
+
+def _pool(count, mean, sd, q, nregions):
+    """Overwrite every first region (``Europe``) with the pooled statistics of the others."""
+    if nregions < 2:
+        return
+    shape = (-1, nregions)
+    c = count.reshape(shape)[:, 1:].astype(np.float64)
+    m = mean.reshape(shape)[:, 1:]
+    s = sd.reshape(shape)[:, 1:]
+    total = c.sum(axis=1)
+    pooled = (c * m).sum(axis=1) / total
+    first = np.arange(0, len(count), nregions)
+    count[first] = total
+    mean[first] = pooled
+    sd[first] = np.sqrt((c * (s ** 2 + (m - pooled[:, None]) ** 2)).sum(axis=1) / total)
+    # Percentiles of a mixture are not a weighted mean, but close enough for synthetic data
+    q[first] = (c[:, :, None] * q.reshape(len(first), nregions, -1)[:, 1:]).sum(axis=1) / total[:, None]
+
+
+def lst_chunks(patch, forest, season, variables=("Day", "Night"), regions=5, first_loss_year=2004, cohorts=20,
+               suffix="", seed=0, chunk_rows=100_000):
+    """Yield ``{variable: frame}`` chunks of the records of one export.
+
+    The day and night chunks share their keys, so they pair one to one.
+    ``Daily_Mean`` is the average of the day and night statistics.
+    """
+    names = region_names(regions)
+    percentiles = list(PERCENTILES) if patch == "220cell" else COARSE_PERCENTILES
+    keys = _cohort_keys(first_loss_year, cohorts)
+    label = forest if not suffix else f"{forest}_{suffix}"
+    per_chunk = max(1, chunk_rows // len(names))
+
+    for start in range(0, len(keys), per_chunk):
+        rng = _rng(seed, patch, forest, season, suffix, start)
+        loss, year = np.array(keys[start:start + per_chunk]).T
+        loss, year = np.repeat(loss, len(names)), np.repeat(year, len(names))
+        region = np.tile(np.arange(len(names)), len(keys[start:start + per_chunk]))
+        effect_year = year - loss
+
+        base_count = PATCH_COUNTS.get(patch, 500) * np.exp(-0.03 * (effect_year - 1)) * rng.lognormal(0, 0.8, len(loss))
+        stats = {}
+        for variable in ("Day", "Night"):
+            stats[variable] = _variable_stats(rng, VARIABLE_PARAMS[variable], season, effect_year, base_count,
+                                              percentiles)
+            _pool(*stats[variable], len(names))
+        day, night = stats["Day"], stats["Night"]
+        stats["Daily_Mean"] = (np.minimum(day[0], night[0]), (day[1] + night[1]) / 2, (day[2] + night[2]) / 2,
+                               (day[3] + night[3]) / 2)
+
+        index = [f"LST_diff_{_index_patch(patch)}_loss_{l}_analysis_{a}_{label}_{r}"
+                 for l, a, r in zip(loss, year, region)]
+        labels = {
+            "analysisYear": year.astype(np.float64),
+            "forest": forest,
+            "lossYear": loss.astype(np.float64),
+            "region": np.array(names, dtype=object)[region],
+            "season": season,
+            ".geo": GEO,
+        }
+        chunk = {}
+        for variable in variables:
+            count, mean, sd, q = stats[variable]
+            columns = {"count": count, "mean": mean, "stdDev": sd}
+            columns.update({p: q[:, i] for i, p in enumerate(percentiles)})
+            frame = {"system:index": index}
+            frame.update({f"LST_{variable}_{s}": columns[s] for s in sorted(columns)})
+            frame.update(labels)
+            chunk[variable] = pd.DataFrame(frame, columns=lst_columns(variable, patch))
+        yield chunk
+
+
+def lst_file_name(variable, patch, forest, season, suffix=""):
+    return f"LST_{variable}_{patch}_{forest}_{season}" + (f"_{suffix}" if suffix else "") + ".csv"
+
+
+def write_lst_exports(out_dir, patches=("220cell",), forests=("TOT",), seasons=SEASONS,
+                      variables=("Day", "Night"), regions=5, first_loss_year=2004, cohorts=20, suffix="",
+                      seed=0, chunk_rows=100_000):
+    """Write one export per variable, patch, forest and season; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for patch, forest, season in itertools.product(patches, forests, seasons):
+        files = {v: os.path.join(out_dir, lst_file_name(v, patch, forest, season, suffix)) for v in variables}
+        handles = {v: open(path, "w", newline="") for v, path in files.items()}
+        try:
+            for v, f in handles.items():
+                f.write(",".join(lst_columns(v, patch)) + "\n")
+            for chunk in lst_chunks(patch, forest, season, variables, regions, first_loss_year, cohorts, suffix,
+                                    seed, chunk_rows):
+                for v, frame in chunk.items():
+                    frame.to_csv(handles[v], header=False, index=False)
+        finally:
+            for f in handles.values():
+                f.close()
+        paths.extend(files.values())
+    return paths
+
+
+def write_country_exports(out_dir, countries=26, years=range(2001, 2024), layout=COUNTRY_LAYOUT, seed=0):
+    """Write the ``Country_Forest_Change_*`` files of every layout directory; returns the paths."""
+    years = list(years)
+    paths = []
+    for code in country_codes(countries):
+        rng = _rng(seed, "country", code)
+        # Country size, a slow trend and year-to-year swings shared by all variants
+        base = rng.lognormal(np.log(5e7), 1.0) * np.exp(0.02 * np.arange(len(years)))
+        base *= rng.lognormal(0, 0.25, len(years))
+        for directory, variants in layout.items():
+            os.makedirs(os.path.join(out_dir, directory), exist_ok=True)
+            for variant in variants:
+                area = base * VARIANT_SHARES.get(variant, 1.0) * rng.lognormal(0, 0.05, len(years))
+                path = os.path.join(out_dir, directory, f"Country_Forest_Change_{variant}_{code}.csv")
+                with open(path, "w", newline="") as f:
+                    f.write("system:index,Forest Loss Total,year,.geo\n")
+                    for i, (value, year) in enumerate(zip(area, years)):
+                        f.write(f"{i},{java_double(value)},{float(year)},{_GEO_FIELD}\n")
+                paths.append(path)
+    return paths
+
+
+def _forest_fraction(rows, cols, width, height):
+    """Smooth forest cover in [0, 1] with open gaps, from the pixel position only."""
+    y = rows[:, None] / height
+    x = cols[None, :] / width
+    field = 0.5 + 0.3 * np.sin(6.1 * x + 1.3) * np.cos(4.7 * y) + 0.2 * np.sin(17.0 * x * y + 2.0)
+    return np.clip(field, 0, 1) * (field > 0.15)
+
+
+def write_loss_rasters(out_dir, width=GRID_SIZE[0], height=GRID_SIZE[1], first_year=2000, years=24, seed=0,
+                       block_rows=256):
+    """Write ``FinalLoss_at_20km_{last}.tif`` (one band per year) and ``Forest2000_at_20km_{last}.tif``.
+
+    The loss of a pixel is its forest area times a per-pixel harvest rate,
+    with year-to-year noise and rare windthrow-like spikes. Rasters are
+    written ``block_rows`` rows at a time. Returns the two paths.
+    """
+    import rasterio
+    from rasterio.transform import from_origin
+
+    os.makedirs(out_dir, exist_ok=True)
+    last = first_year + years - 1
+    loss_path = os.path.join(out_dir, f"FinalLoss_at_20km_{last}.tif")
+    forest_path = os.path.join(out_dir, f"Forest2000_at_20km_{last}.tif")
+    profile = dict(driver="GTiff", width=width, height=height, dtype="float32", crs="EPSG:4326",
+                   transform=from_origin(*GRID_ORIGIN, GRID_STEP, GRID_STEP), tiled=True,
+                   blockxsize=256, blockysize=256, compress="lzw")
+
+    cols = np.arange(width)
+    with rasterio.open(loss_path, "w", count=years, **profile) as loss_dst, \
+            rasterio.open(forest_path, "w", count=1, **profile) as forest_dst:
+        for row in range(0, height, block_rows):
+            rows = np.arange(row, min(row + block_rows, height))
+            window = rasterio.windows.Window(0, row, width, len(rows))
+            rng = _rng(seed, "raster", row)
+            forest = (FULL_FOREST * _forest_fraction(rows, cols, width, height)).astype(np.float32)
+            rate = rng.lognormal(np.log(0.008), 0.6, forest.shape)
+            noise = rng.gamma(4.0, 0.25, (years, *forest.shape))
+            spikes = np.where(rng.random((years, *forest.shape)) < 0.01, rng.uniform(5, 20, (years, *forest.shape)), 1)
+            loss = np.minimum(forest * rate * noise * spikes, forest).astype(np.float32)
+            loss_dst.write(loss, window=window)
+            forest_dst.write(forest, 1, window=window)
+    return loss_path, forest_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", help="corpus directory; LST exports go to its LST_Diff")
+    parser.add_argument("--patches", nargs="+", default=["220cell", "330cell", "5km"])
+    parser.add_argument("--forests", nargs="+", default=["TOT", "BF", "NF", "MF"])
+    parser.add_argument("--variables", nargs="+", default=["Day", "Night"], choices=["Day", "Night", "Daily_Mean"])
+    parser.add_argument("--regions", type=int, default=len(REGIONS))
+    parser.add_argument("--first-loss-year", type=int, default=2004)
+    parser.add_argument("--cohorts", type=int, default=20, help="loss years")
+    parser.add_argument("--countries", type=int, default=len(COUNTRY_NAMES))
+    parser.add_argument("--raster-size", nargs=2, type=int, default=list(GRID_SIZE), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--raster-years", type=int, default=24, help="loss bands from 2000")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    paths = write_lst_exports(os.path.join(args.out_dir, "LST_Diff"), args.patches, args.forests,
+                              variables=args.variables, regions=args.regions,
+                              first_loss_year=args.first_loss_year, cohorts=args.cohorts, seed=args.seed)
+    last_year = args.first_loss_year + args.cohorts
+    paths += write_country_exports(args.out_dir, args.countries, range(2001, last_year), seed=args.seed)
+    paths += write_loss_rasters(args.out_dir, *args.raster_size, years=args.raster_years, seed=args.seed)
+
+    size = sum(os.path.getsize(p) for p in paths)
+    print(f"Wrote {len(paths)} files, {size / 2**20:.1f} MB, to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Per-stage timing and memory traces of the pipeline.
+
+Library functions mark their named stages (``read_csv``, ``pairing``,
+``groupby``, ``basemap``, ``savefig``, ...) with ``stage`` or ``traced``.
+Tracing is off by default, and then a stage costs one global lookup.
+
+Set ``FOREST_HARVEST_TRACE`` to switch it on:
+- ``1`` writes ``trace.jsonl`` under the cache directory;
+- a path writes there: CSV if it ends in ``.csv``, else JSON lines.
+Or call ``enable(path)``, which the ``--trace`` options do. Every finished
+stage records:
+- wall and CPU time;
+- the peak of traced allocations (``tracemalloc``, numpy buffers included)
+  above what was allocated when it started, and the process's peak RSS at
+  its end;
+- its row or pixel counts;
+- its parent stage and the script that ran it.
+The records are appended to the trace file as each outermost stage ends,
+so pool workers add their own stages to the same file. Summarise a trace
+per stage with::
+
+    python -m forest_harvest.trace ../data/.cache/trace.jsonl
+"""
+
+import argparse
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .paths import CACHE_DIR
+
+TRACE_ENV = "FOREST_HARVEST_TRACE"
+
+FIELDS = ["script", "pid", "stage", "parent", "start_s", "wall_s", "cpu_s", "peak_alloc_mb", "max_rss_mb",
+          "rows", "pixels"]
+
+
+def _max_rss_mb():
+    """Peak resident set size of this process in MB; None where ``resource`` is missing (Windows)."""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class _NullStage:
+    def count(self, **counts):
+        pass
+
+
+_NULL = nullcontext(_NullStage())
+
+
+class Stage:
+    """One running stage; ``count(rows=..., pixels=...)`` adds its sizes."""
+
+    def __init__(self, tracer, name, counts):
+        self.tracer = tracer
+        self.name = name
+        self.counts = dict(counts)
+        self.peak = 0
+
+    def count(self, **counts):
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+
+    def __enter__(self):
+        self.tracer.adopt()
+        stack = self.tracer.stack
+        if stack:
+            # Keep the parent's peak so far before the child resets it
+            stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        self.parent = stack[-1].name if stack else ""
+        stack.append(self)
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        stack = self.tracer.stack
+        stack.pop()
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        self.tracer.records.append({
+            "script": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "",
+            "pid": os.getpid(),
+            "stage": self.name,
+            "parent": self.parent,
+            "start_s": round(self.start_wall - self.tracer.origin, 6),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_alloc_mb": round(max(0, self.peak - self.base) / 2**20, 3),
+            "max_rss_mb": _max_rss_mb(),
+            "rows": self.counts.get("rows"),
+            "pixels": self.counts.get("pixels"),
+        })
+        # Pool workers leave without running atexit, so write out every finished top-level stage
+        if not stack:
+            self.tracer.flush()
+        return False
+
+
+class Tracer:
+    """Collects stage records and appends them to ``path``."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.records = []
+        self.stack = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        atexit.register(self.flush)
+
+    def adopt(self):
+        """In a forked worker, drop the stages inherited from the parent."""
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.records = []
+            self.stack = []
+
+    def flush(self):
+        if not self.records:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self.path.endswith(".csv"):
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                if new:
+                    writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(self.path, "a") as f:
+                for record in self.records:
+                    f.write(json.dumps(record) + "\n")
+        self.records = []
+
+
+_tracer = None
+
+
+def enable(path=None):
+    """Start tracing this process (and workers started from it) to ``path``."""
+    global _tracer
+    if path is None:
+        path = os.path.join(CACHE_DIR, "trace.jsonl")
+    path = os.path.abspath(path)
+    os.environ[TRACE_ENV] = path
+    if _tracer is None or _tracer.path != path:
+        if _tracer is not None:
+            _tracer.flush()
+        _tracer = Tracer(path)
+    return _tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def stage(name, **counts):
+    """Context manager timing the stage ``name``; yields an object with ``count(rows=..., pixels=...)``."""
+    if _tracer is None:
+        return _NULL
+    return Stage(_tracer, name, counts)
+
+
+def _size(result):
+    """Row count of a frame, pixel count of a 2-D or larger array."""
+    shape = getattr(result, "shape", None)
+    if shape is None:
+        return {}
+    if len(shape) >= 2 and hasattr(result, "dtype"):
+        return {"pixels": shape[-2] * shape[-1]}
+    return {"rows": shape[0]} if shape else {}
+
+
+def traced(name):
+    """Decorator: run the function as stage ``name`` and count the rows or pixels of its result."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Stage(_tracer, name, {}) as current:
+                result = func(*args, **kwargs)
+                current.count(**_size(result))
+            return result
+        return wrapper
+    return decorate
+
+
+def read_trace(path):
+    """Records of a CSV or JSON-lines trace as a frame."""
+    import pandas as pd
+
+    path = os.fspath(path)
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_json(path, lines=True)
+
+
+def summary(records):
+    """Calls, total wall and CPU time, largest peak allocation and total rows/pixels per stage."""
+    records = records.assign(parent=records["parent"].fillna(""))
+    out = records.groupby(["stage", "parent"]).agg(
+        calls=("wall_s", "size"), wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"),
+        peak_alloc_mb=("peak_alloc_mb", "max"), max_rss_mb=("max_rss_mb", "max"),
+        rows=("rows", "sum"), pixels=("pixels", "sum"))
+    return out.sort_values("wall_s", ascending=False)
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Summarise a stage trace per stage")
+    parser.add_argument("path", nargs="?", default=os.path.join(CACHE_DIR, "trace.jsonl"))
+    args = parser.parse_args(argv)
+    with pd.option_context("display.width", 200, "display.max_rows", None, "display.max_columns", None):
+        print(summary(read_trace(args.path)))
+
+
+_setting = os.environ.get(TRACE_ENV, "")
+if _setting not in ("", "0"):
+    enable(None if _setting == "1" else _setting)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Per-pixel trends of the yearly harvest fraction.
+
+The yearly harvest fraction of Figure 1a's chain (``rho`` per year,
+windthrow outliers removed) is kept as a year cube (``raster_cube``) by
+``harvest_fraction_cube``. ``pixel_trends`` maps, for every pixel's series,
+- the Theil-Sen slope (% per year);
+- Kendall's tau and the Mann-Kendall Z and two-sided p (tie-corrected
+  variance, normal approximation);
+- the Pettitt change point (last year before the shift) and its p.
+Every statistic comes from the pairwise differences of the years, computed
+for a whole block of pixels at once. The differences give the slopes, the
+signs give the Mann-Kendall S, and the Pettitt statistics are a matrix
+product of the signs. NaN years (outliers, no forest) are left out of a
+pixel's pairs. Pixels with fewer than ``MIN_YEARS`` valid years get NaN.
+Row blocks run on a process pool; each worker maps the cube itself, so
+only the results travel back. Run from the ``code`` directory::
+
+    python -m forest_harvest.trends --workers 8
+"""
+
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from . import raster_cube, trace
+from .harvest_figures import FOREST_RASTER, LOSS_RASTER
+from .harvest_raster import YEAR_BANDS, block_rows, harvest_fraction_block, row_windows
+from .paths import CACHE_DIR, DATA_DIR
+
+# Bands of the output GeoTIFF
+TREND_BANDS = ["slope", "tau", "mk_z", "mk_p", "change_year", "change_p", "n_years"]
+
+# Fewest valid years for a trend
+MIN_YEARS = 8
+
+# Cube of the yearly harvest fraction of Figure 1a's chain
+HARVEST_FRACTION_CUBE = "harvest_fraction"
+
+
+def _erfc(x):
+    """Complementary error function (Numerical Recipes' erfcc, relative error < 1.2e-7)."""
+    z = np.abs(x)
+    t = 1 / (1 + 0.5 * z)
+    poly = -1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    r = t * np.exp(-z * z + poly)
+    return np.where(x >= 0, r, 2 - r)
+
+
+def _sorted_median(sorted_rows, n_valid):
+    """Median along the last axis of rows sorted with NaNs last, given the valid counts."""
+    lo = np.take_along_axis(sorted_rows, (np.maximum(n_valid - 1, 0) // 2)[:, None], axis=1)[:, 0]
+    hi = np.take_along_axis(sorted_rows, (n_valid // 2)[:, None], axis=1)[:, 0]
+    median = (lo + hi) / 2
+    median[n_valid == 0] = np.nan
+    return median
+
+
+def trend_block(block, years, min_years=MIN_YEARS):
+    """Trend statistics of a ``(year, row, col)`` block as a ``(len(TREND_BANDS), row, col)`` float32 array."""
+    years = np.asarray(years)
+    n_years, rows, cols = block.shape
+    x = np.ascontiguousarray(np.asarray(block, dtype=np.float32).reshape(n_years, -1).T)  # pixel x year
+
+    # All pairs i < j of years; ``incidence`` maps a pair to -1 at i and +1 at j
+    ii, jj = np.triu_indices(n_years, 1)
+    pairs = np.arange(len(ii))
+    incidence = np.zeros((len(ii), n_years), dtype=np.float32)
+    incidence[pairs, ii] = -1
+    incidence[pairs, jj] = 1
+
+    diff = x[:, jj] - x[:, ii]  # NaN where either year is missing
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=1)
+
+    # Theil-Sen: median of the pairwise slopes
+    slopes = diff / (years[jj] - years[ii]).astype(np.float32)
+    slopes.sort(axis=1)
+    slope = _sorted_median(slopes, n * (n - 1) // 2)
+    del slopes
+
+    # Mann-Kendall S, with the variance corrected for tied values
+    sign = np.sign(diff)
+    np.nan_to_num(sign, copy=False)
+    s = sign.sum(axis=1, dtype=np.float64)
+    tied = (diff == 0).astype(np.float32) @ np.abs(incidence)  # other values equal to each year's
+    ties = np.where(valid, tied * (2 * tied + 7), 0).sum(axis=1)  # sum of t(t-1)(2t+5) over tie groups
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (n * (n - 1.0) * (2 * n + 5) - ties) / 18
+        z = np.where(s > 0, s - 1, np.where(s < 0, s + 1, 0)) / np.sqrt(var)
+        z[var <= 0] = 0
+        tau = s / (n * (n - 1) / 2)
+    p = _erfc(np.abs(z) / math.sqrt(2))
+
+    # Pettitt: U_t is the running sum of sum_j sign(x_t - x_j)
+    u = np.cumsum(sign @ incidence, axis=1)
+    k = np.abs(u).max(axis=1)
+    change = years[np.abs(u).argmax(axis=1)].astype(np.float32)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        change_p = np.minimum(1, 2 * np.exp(-6 * k * k / (n ** 3.0 + n ** 2.0)))
+
+    out = np.stack([slope, tau, z, p, change, change_p, n]).astype(np.float32)
+    out[:-1, n < min_years] = np.nan
+    return out.reshape(len(TREND_BANDS), rows, cols)
+
+
+def harvest_fraction_cube(loss_path=None, forest_path=None, cube_dir=None, year_bands=YEAR_BANDS,
+                          first_year=raster_cube.FIRST_YEAR, memory_budget_mb=256, workers=None):
+    """Cube of the yearly harvest fraction (``harvest_raster.harvest_fraction_block``) over ``year_bands``.
+
+    The rasters default to Figure 1a's inputs in ``DATA_DIR``; band 0 of the
+    loss stack is ``first_year``. The cube is kept under
+    ``CACHE_DIR/cubes`` and rebuilt when either raster changes.
+    """
+    loss_path = os.path.join(DATA_DIR, LOSS_RASTER) if loss_path is None else loss_path
+    forest_path = os.path.join(DATA_DIR, FOREST_RASTER) if forest_path is None else forest_path
+    cube_dir = os.path.join(CACHE_DIR, "cubes", HARVEST_FRACTION_CUBE) if cube_dir is None else cube_dir
+
+    with rasterio.open(loss_path) as loss_src:
+        years = list(range(first_year, first_year + loss_src.count))[year_bands]
+    if raster_cube.is_current(cube_dir, [loss_path, forest_path], years):
+        return raster_cube.RasterCube(cube_dir)
+
+    with rasterio.open(loss_path) as loss_src, rasterio.open(forest_path) as forest_src, \
+            trace.stage("harvest_fraction_cube", pixels=loss_src.width * loss_src.height):
+        if (loss_src.shape, loss_src.transform) != (forest_src.shape, forest_src.transform):
+            raise ValueError(f"{loss_path} and {forest_path} are not on the same grid")
+        rows = min(loss_src.height, block_rows(loss_src.count, loss_src.width, memory_budget_mb))
+        blocks = ((window, harvest_fraction_block(loss_src.read(window=window), forest_src.read(1, window=window),
+                                                  year_bands, workers))
+                  for window in row_windows(loss_src.height, loss_src.width, rows))
+        raster_cube.write_cube(cube_dir, blocks, years, loss_src.height, loss_src.width, loss_src.transform,
+                               loss_src.crs, nodata=np.nan, sources=[loss_path, forest_path])
+    return raster_cube.RasterCube(cube_dir)
+
+
+# Cubes opened by this process, so pool workers map each cube once
+_open_cubes = {}
+
+
+def _trend_rows(cube_dir, row_off, height, start, end, min_years):
+    cube = _open_cubes.get(cube_dir)
+    if cube is None:
+        cube = _open_cubes[cube_dir] = raster_cube.RasterCube(cube_dir)
+    with trace.stage("trend_block", pixels=height * cube.shape[2]):
+        block, _ = cube.window(Window(0, row_off, cube.shape[2], height), (start, end))
+        return row_off, trend_block(block, cube.years_between(start, end)[1], min_years)
+
+
+def _trend_block_rows(years, width, memory_budget_mb):
+    """Rows per trend block within ``memory_budget_mb`` (about five pair-sized float32 arrays per pixel)."""
+    pairs = years * (years - 1) // 2
+    return max(1, int(memory_budget_mb * 2**20 // (width * 4 * (5 * pairs + 4 * years))))
+
+
+def pixel_trends(cube, out_path, start=None, end=None, min_years=MIN_YEARS, workers=None, memory_budget_mb=256):
+    """Write the ``TREND_BANDS`` of every pixel of ``cube`` over the years ``start``-``end`` to a GeoTIFF.
+
+    ``cube`` is a ``RasterCube`` or its directory. Row blocks stay within
+    ``memory_budget_mb`` per worker and run on ``workers`` processes
+    (``1`` runs inline). Returns ``out_path``.
+    """
+    cube = raster_cube.RasterCube(cube) if not isinstance(cube, raster_cube.RasterCube) else cube
+    start = int(cube.years[0]) if start is None else start
+    end = int(cube.years[-1]) if end is None else end
+    n_years = len(cube.years_between(start, end)[1])
+    if n_years < 3:
+        raise ValueError(f"Need at least 3 years for a trend, got {n_years} in {start}-{end}")
+
+    _, height, width = cube.shape
+    workers = os.cpu_count() if workers is None else workers
+    rows = min(_trend_block_rows(n_years, width, memory_budget_mb), max(1, -(-height // (4 * workers))))
+    tasks = [(str(cube.path), window.row_off, window.height, start, end, min_years)
+             for window in row_windows(height, width, rows)]
+
+    profile = cube.profile(count=len(TREND_BANDS))
+    profile["nodata"] = np.nan
+    with rasterio.open(out_path, "w", **profile) as dst, \
+            trace.stage("pixel_trends", pixels=height * width):
+        dst.descriptions = tuple(TREND_BANDS)
+        if workers == 1 or len(tasks) < 2:
+            results = (_trend_rows(*task) for task in tasks)
+            for row_off, block in results:
+                dst.write(block, window=Window(0, row_off, width, block.shape[1]))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for row_off, block in pool.map(_trend_rows, *zip(*tasks)):
+                    dst.write(block, window=Window(0, row_off, width, block.shape[1]))
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Map per-pixel harvest trends (Theil-Sen, Mann-Kendall, Pettitt)")
+    parser.add_argument("--cube", help="year cube to analyse (default: the harvest fraction cube of --loss/--forest)")
+    parser.add_argument("--loss", help="loss stack (default: DATA_DIR/FinalLoss_at_20km_2023.tif)")
+    parser.add_argument("--forest", help="forest raster (default: DATA_DIR/Forest2000_at_20km_2023.tif)")
+    parser.add_argument("--years", nargs=2, type=int, metavar=("START", "END"), help="default: every year of the cube")
+    parser.add_argument("--min-years", type=int, default=MIN_YEARS)
+    parser.add_argument("--out", default=os.path.join(CACHE_DIR, "harvest_trends.tif"))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--memory-budget-mb", type=int, default=256, help="per worker")
+    args = parser.parse_args(argv)
+
+    if args.cube:
+        cube = raster_cube.RasterCube(args.cube)
+    else:
+        cube = harvest_fraction_cube(args.loss, args.forest, memory_budget_mb=args.memory_budget_mb)
+    start, end = args.years or (None, None)
+    out = pixel_trends(cube, args.out, start, end, args.min_years, args.workers, args.memory_budget_mb)
+    print(f"Trends of {cube.path} written to {out}")
+
+
+if __name__ == "__main__":
+    main()